@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy
+import pytesseract as tess
+
+from sudoku_img_helpers.extractor import SudokuExtractor
+from sudoku_img_helpers.recognizers import KNN, RECOGNIZERS, TESSERACT, get_recognizer
+from sudoku_solver_benchmark import NS_PER_MS, summarize
+from sudoku_utils.corpus import make_tier
+from sudoku_utils.csv import load_sudoku
+
+RESULT_TEXT = ("Recognizer: {name} read {images} grids, {correct}/{cells} cells right ({accuracy:.2%}), "
+               "{digit_errors} digits misread, {empty_errors} empty cells mistaken, {exact} grids exact, "
+               "recognition time median {ms[median]:.3f}ms p95 {ms[p95]:.3f}ms max {ms[max]:.3f}ms")
+SKIPPED_TEXT = "Recognizer: {} skipped, {}"
+
+# Synthetic photos of printed grids
+PHOTO_SIZE = 1000
+GRID_MARGIN = 100
+FONTS = (cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX, cv2.FONT_HERSHEY_COMPLEX, cv2.FONT_HERSHEY_TRIPLEX)
+
+
+def render_grid(values: List[Optional[int]], rng: random.Random) -> numpy.ndarray:
+    """
+    Draw the grid in a random font, slightly rotated, blurred and noisy, like a photo of a printed sudoku
+    """
+    image = numpy.full((PHOTO_SIZE, PHOTO_SIZE, 3), 255, dtype=numpy.uint8)
+    cell_size = (PHOTO_SIZE - 2 * GRID_MARGIN) / 9
+    for line in range(10):
+        position = int(GRID_MARGIN + line * cell_size)
+        thickness = 4 if line % 3 == 0 else 2
+        cv2.line(image, (GRID_MARGIN, position), (PHOTO_SIZE - GRID_MARGIN, position), (0, 0, 0), thickness)
+        cv2.line(image, (position, GRID_MARGIN), (position, PHOTO_SIZE - GRID_MARGIN), (0, 0, 0), thickness)
+
+    font = rng.choice(FONTS)
+    thickness = rng.choice((2, 3))
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        text = str(value)
+        (_, unit_height), _ = cv2.getTextSize(text, font, 1, thickness)
+        scale = cell_size * 0.55 / unit_height
+        (width, height), _ = cv2.getTextSize(text, font, scale, thickness)
+        x = GRID_MARGIN + (index % 9 + 0.5) * cell_size - width / 2
+        y = GRID_MARGIN + (index // 9 + 0.5) * cell_size + height / 2
+        cv2.putText(image, text, (int(x), int(y)), font, scale, (0, 0, 0), thickness, cv2.LINE_AA)
+
+    rotation = cv2.getRotationMatrix2D((PHOTO_SIZE / 2, PHOTO_SIZE / 2), rng.uniform(-5, 5), 1)
+    image = cv2.warpAffine(image, rotation, (PHOTO_SIZE, PHOTO_SIZE), borderValue=(255, 255, 255))
+    image = cv2.GaussianBlur(image, (3, 3), 0)
+    noise = numpy.random.RandomState(rng.randrange(2 ** 32)).normal(0, 8, image.shape)
+    return (image + noise).clip(0, 255).astype(numpy.uint8)
+
+
+def load_images(pattern: str) -> List[Tuple[numpy.ndarray, List[Optional[int]]]]:
+    """
+    Photos matching the glob whose values are in a sudoku file of the same name with a .csv extension
+    """
+    images = []
+    for filename in sorted(glob.glob(pattern)):
+        labels = os.path.splitext(filename)[0] + ".csv"
+        if os.path.isfile(labels):
+            images.append((cv2.imread(filename), load_sudoku(labels)))
+    return images
+
+
+def benchmark_recognizer(recognizer, grids: List[Tuple[List, List[Optional[int]]]]) -> Dict:
+    times = []
+    correct = digit_errors = empty_errors = exact = 0
+    for cell_images, expected in grids:
+        start = time.perf_counter_ns()
+        recognitions = recognizer.recognize(cell_images)
+        times.append((time.perf_counter_ns() - start) / NS_PER_MS)
+
+        found = [value for value, _ in recognitions]
+        correct += sum(value == expected_value for value, expected_value in zip(found, expected))
+        digit_errors += sum(expected_value is not None and value != expected_value
+                            for value, expected_value in zip(found, expected))
+        empty_errors += sum(expected_value is None and value is not None
+                            for value, expected_value in zip(found, expected))
+        exact += found == expected
+
+    cells = sum(len(expected) for _, expected in grids)
+    return {
+        "images": len(grids),
+        "cells": cells,
+        "correct": correct,
+        "accuracy": correct / cells,
+        "digit_errors": digit_errors,
+        "empty_errors": empty_errors,
+        "exact": exact,
+        "ms": summarize(times),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the accuracy and speed of the digit recognizers")
+    parser.add_argument("--images", help="Glob of photos of sudokus, each with a .csv file of its values next to "
+                                         "it, synthetic photos are rendered by default")
+    parser.add_argument("--count", type=int, default=20, help="Number of synthetic photos")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic photos")
+    parser.add_argument("--recognizers", default=",".join(RECOGNIZERS),
+                        help="Comma separated recognizers, the Tesseract ones are skipped without Tesseract")
+    parser.add_argument("--samples", help="Samples of the {} recognizer, see KnnRecognizer.save".format(KNN))
+    parser.add_argument("--json", help="File to write the results to")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.images:
+        photos = load_images(args.images)
+    else:
+        rng = random.Random(args.seed)
+        photos = [(render_grid(values, rng), values) for values in make_tier("easy", args.count, args.seed)]
+
+    # The cells are cut once so only the recognition is timed
+    grids = [(SudokuExtractor(image).extract_cells(), values) for image, values in photos]
+    grids = [(cell_images, values) for cell_images, values in grids if len(cell_images) == len(values)]
+    print("Found the grid of {}/{} photos".format(len(grids), len(photos)))
+
+    results = {"images": args.images or {"count": args.count, "seed": args.seed}, "recognizers": {}}
+    for name in args.recognizers.split(","):
+        options = {"samples_path": args.samples} if name == KNN else {}
+        recognizer = get_recognizer(name, **options)
+        try:
+            result = benchmark_recognizer(recognizer, grids)
+        except tess.TesseractNotFoundError as error:
+            print(SKIPPED_TEXT.format(name, error))
+            continue
+        results["recognizers"][name] = result
+        print(RESULT_TEXT.format(name=name, **result))
+
+    if TESSERACT in results["recognizers"] and KNN in results["recognizers"]:
+        print("{} is {:.1f}x faster than {}".format(KNN, results["recognizers"][TESSERACT]["ms"]["median"] /
+                                                   results["recognizers"][KNN]["ms"]["median"], TESSERACT))
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
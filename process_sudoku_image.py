@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
+import argparse
+import csv
 import glob
+import itertools
 import os
 
 import cv2
 
-from sudoku_img_helpers.elements import BOTTOM_LEFT
 from sudoku_img_helpers.extractor import SudokuExtractor
+from sudoku_img_helpers.pipeline import DEFAULT_QUEUE_SIZE, StageStats, draw_values, make_stages, run_pipeline
+from sudoku_img_helpers.recognizers import DEFAULT_RECOGNIZER, KNN, RECOGNIZERS
 from sudoku_solvers.metro_sudoku_solver import SudokuSolver
-from sudoku_utils.csv import save_sudoku
+from sudoku_solvers.registry import BUDGET, select_solver, solver_names
+from sudoku_utils.csv import format_sudoku_line, save_sudoku
+
+RESULTS_FILENAME = "results.csv"
+RESULTS_HEADER = ("image", "output", "status", "found", "solution", "min_confidence", "failed_stage", "error")
+# Images processed between two reports of the batch mode
+REPORT_INTERVAL = 1000
 
 
 def save(sudoku_values):
@@ -37,19 +47,14 @@ def process_image(image):
     print("Processing Image")
     extractor = SudokuExtractor(image)
     found_values = extractor.extract_sudoku()
+    for issue in extractor.issues:
+        print("Invalid sudoku: {} in cells {}".format(issue.reason, issue.cells))
     print("Solving Sudoku")
     solver = SudokuSolver(found_values)
     result = solver.solve()
-    solved_values = []
-    for existing_value, found_value in zip(found_values, result):
-        if existing_value is None:
-            solved_values.append(found_value)
-        else:
-            solved_values.append(None)
-
-    sudoku_solved = extractor.write_sudoku_values(solved_values, font_scale=3)
-    sudoku_solved = extractor.write_sudoku_values(found_values, sudoku_solved,
-                                                  color=(0, 0, 255), position=BOTTOM_LEFT, font_scale=1.5)
+    if not result.solved:
+        print("No solution could be found: {}".format(result.status))
+    sudoku_solved = draw_values(extractor.sudoku_image, extractor.sudoku_position, found_values, result)
     cv2.imshow("Sudoku", sudoku_solved)
     cv2.waitKey(0)
     if should_save():
@@ -58,10 +63,69 @@ def process_image(image):
         print("Sudoku saved")
 
 
-if __name__ == '__main__':
-    filenames = glob.glob("./*.png") + glob.glob("./*.jpg")
+def result_row(job):
+    confidences = [confidence for confidence in job.confidences or [] if confidence is not None]
+    return (
+        job.path,
+        job.output or "",
+        job.result.status if job.result is not None else "",
+        format_sudoku_line(job.values) if job.values is not None else "",
+        format_sudoku_line(job.result.grid) if job.result is not None and job.result.solved else "",
+        "{:.3f}".format(min(confidences)) if confidences else "",
+        job.failed_stage or "",
+        job.error or "",
+    )
+
+
+def process_batch(filenames, output_dir, queue_size=DEFAULT_QUEUE_SIZE, **stage_options):
+    """
+    Process the images without any interaction, writing the annotated images and a CSV file of
+    the results to the output directory
+    """
+    stages = make_stages(output_dir, **stage_options)
+    os.makedirs(output_dir, exist_ok=True)
+    stats = StageStats(stages)
+    with open(os.path.join(output_dir, RESULTS_FILENAME), "w", newline="") as results_file:
+        writer = csv.writer(results_file)
+        writer.writerow(RESULTS_HEADER)
+        for count, job in enumerate(run_pipeline(filenames, stages, queue_size), 1):
+            writer.writerow(result_row(job))
+            stats.add(job)
+            if count % REPORT_INTERVAL == 0:
+                print(stats.report())
+    print(stats.report())
 
-    for filename in filenames:
-        image = cv2.imread(filename)
-        process_image(image)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Read, solve and annotate the sudokus of photos")
+    parser.add_argument("images", nargs="*", help="Globs of the images, the png and jpg images of the current "
+                                                  "directory by default")
+    parser.add_argument("--output", help="Process the images in batch, without showing them, and write the "
+                                         "annotated images and {} to this directory".format(RESULTS_FILENAME))
+    parser.add_argument("--workers", type=int, help="Processes shared by the stages of the batch mode, defaults to "
+                                                    "the number of CPUs")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Images queued between two stages of the batch mode")
+    parser.add_argument("--recognizer", choices=list(RECOGNIZERS), default=DEFAULT_RECOGNIZER,
+                        help="Digit recognizer of the batch mode")
+    parser.add_argument("--samples", help="Samples of the {} recognizer, see KnnRecognizer.save".format(KNN))
+    parser.add_argument("--solver", choices=solver_names(), default=select_solver(BUDGET).name,
+                        help="Solver of the batch mode")
+    parser.add_argument("--time-limit", type=float, default=1.0,
+                        help="Time budget in seconds of each solve of the batch mode")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    patterns = args.images or ["./*.png", "./*.jpg"]
+    filenames = itertools.chain.from_iterable(glob.iglob(pattern) for pattern in patterns)
+
+    if args.output:
+        recognizer_options = {"samples_path": args.samples} if args.recognizer == KNN else {}
+        process_batch(filenames, args.output, args.queue_size, recognizer=args.recognizer, solver=args.solver,
+                      time_limit=args.time_limit, workers=args.workers, **recognizer_options)
+    else:
+        for filename in filenames:
+            image = cv2.imread(filename)
+            process_image(image)
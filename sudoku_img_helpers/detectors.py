@@ -17,7 +17,7 @@ def detect_all_shapes(image) -> Iterable:
     # find contours in the thresholded image and initialize the
     # shape detector
     contours = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL,
-                            cv2.CHAIN_APPROX_SIMPLE)[1]
+                            cv2.CHAIN_APPROX_SIMPLE)[-2]
     return map(Shape, contours)
 
 
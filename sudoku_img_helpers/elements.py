@@ -168,39 +168,72 @@ class Cell:
 class Sudoku(Cell):
     def __init__(self, top_left: Point, top_right: Point, bottom_left: Point, bottom_right: Point):
         super().__init__(top_left, top_right, bottom_left, bottom_right)
-        self._corners = []
-        self._cells = []
-        left_corners = [self._top_left + (self._bottom_left - self._top_left) * (i / 9) for i in range(10)]
-        right_corners = [self._top_right + (self._bottom_right - self._top_right) * (i / 9) for i in range(10)]
+        # Corners of the cells as a (10, 10, 2) array of x, y, interpolated along the left and right
+        # sides then along each row
+        top_left, top_right, bottom_left, bottom_right = numpy.float64([corner.to_list() for corner in self.corners])
+        steps = numpy.linspace(0, 1, 10)[:, None]
+        left_corners = top_left + (bottom_left - top_left) * steps
+        right_corners = top_right + (bottom_right - top_right) * steps
+        self._corners = (left_corners[:, None] + (right_corners - left_corners)[:, None] * steps).astype(numpy.int32)
+        self._cells = None
 
-        for i in range(len(left_corners)):
-            self._corners.append([
-                left_corners[i] + (right_corners[i] - left_corners[i]) * (j / 9) for j in range(10)
-            ])
-
-        for row in range(9):
-            for col in range(9):
-                self._cells.append(Cell(self._corners[row][col], self._corners[row][col + 1],
-                                        self._corners[row + 1][col], self._corners[row + 1][col + 1]))
+    @property
+    def grid(self) -> numpy.ndarray:
+        """
+        Corners of the cells, grid[row, col] being the x, y of the top left corner of the cell at row, col
+        """
+        return self._corners
 
     @property
     def cells(self) -> List[Cell]:
+        # Only built when the cells are drawn or written in
+        if self._cells is None:
+            points = [[Point(x, y) for x, y in row] for row in self._corners.tolist()]
+            self._cells = [Cell(points[row][col], points[row][col + 1],
+                                points[row + 1][col], points[row + 1][col + 1])
+                           for row in range(9) for col in range(9)]
         return self._cells
 
+    def get_cell_images(self, image, offset: float = 0) -> numpy.ndarray:
+        """
+        Images of all the cells cut in one pass, row by row, for a sudoku whose sides are parallel to
+        the image sides like a rectified one. The pixels past a multiple of 9 of the sides are left out.
+        :param offset: Fraction of the cell sides on each border turned white, like Cell.get_cell_image
+        :return: Array of shape (81, cell height, cell width) with the channels of the image if any
+        """
+        assert self._top_left.x == self._bottom_left.x and self._top_left.y == self._top_right.y and \
+            self._top_right.x == self._bottom_right.x and self._bottom_left.y == self._bottom_right.y, \
+            "The sides of the sudoku must be parallel to the image sides"
+
+        x_max, x_min, y_max, y_min = self.get_bounds()
+        cell_width, cell_height = (x_max - x_min) // 9, (y_max - y_min) // 9
+        grid_image = image[y_min:y_min + 9 * cell_height, x_min:x_min + 9 * cell_width]
+        # Splitting the rows and columns of the cells then grouping them is a single copy
+        cell_images = grid_image.reshape((9, cell_height, 9, cell_width) + grid_image.shape[2:]).swapaxes(1, 2)
+        cell_images = cell_images.reshape((81, cell_height, cell_width) + grid_image.shape[2:])
+
+        margin_x, margin_y = int(cell_width * offset), int(cell_height * offset)
+        if margin_y > 0:
+            cell_images[:, :margin_y] = 255
+            cell_images[:, -margin_y:] = 255
+        if margin_x > 0:
+            cell_images[:, :, :margin_x] = 255
+            cell_images[:, :, -margin_x:] = 255
+        return cell_images
+
     def draw_corners(self, image, *args, **kwargs) -> None:
-        for rows in self._corners:
-            for point in rows:
-                point.draw_on_image(image, *args, **kwargs)
+        for x, y in self._corners.reshape(-1, 2).tolist():
+            Point(x, y).draw_on_image(image, *args, **kwargs)
 
     def draw_cells(self, image, *args, **kwargs) -> None:
-        for cell in self._cells:
+        for cell in self.cells:
             cell.draw_on_image(image, *args, **kwargs)
 
     def write_in_cells(self, image, values, font=cv2.FONT_HERSHEY_PLAIN,
                        font_scale=2, color=(0, 0, 0), thickness=2, position=CENTER):
-        assert len(self._cells) == len(values)
+        assert len(self.cells) == len(values)
 
-        for cell, value in zip(self._cells, values):
+        for cell, value in zip(self.cells, values):
             if value is None:
                 continue
             cell.write_on_image(image, str(value), font, font_scale, color, thickness, position)
@@ -1,45 +1,110 @@
 #!/usr/bin/env python3
-from typing import Any
+from typing import Any, Optional
 from copy import deepcopy
 
 import cv2
 import numpy
-import pytesseract as tess
 
 from sudoku_img_helpers.detectors import detect_possible_sudokus
 from sudoku_img_helpers.elements import Sudoku, Point, CENTER
+from sudoku_img_helpers.recognizers import DEFAULT_RECOGNIZER, get_recognizer
+from sudoku_img_helpers.shape import Shape
+from sudoku_utils.validation import Issue, find_issues
+
+# Side in pixels the images are resized to before looking for the sudoku
+IMAGE_SIZE = 1200
+# Fraction of the cell sides left out on each border when reading the cells, where the grid lines are
+CELL_MARGIN = 0.15
+# Issue of the cells holding a digit the recognizer could not read, the sudoku would otherwise be
+# solved without these givens
+UNREADABLE_DIGIT = "unreadable_digit"
 
 
 class SudokuExtractor:
-    def __init__(self, image):
+    def __init__(self, image, recognizer=DEFAULT_RECOGNIZER, **recognizer_options):
+        """
+        :param recognizer: Name of a recognizer of sudoku_img_helpers.recognizers.RECOGNIZERS, or a recognizer
+        :param recognizer_options: Arguments of the recognizer constructor
+        """
         self._image = deepcopy(image)
+        self._recognizer = get_recognizer(recognizer, **recognizer_options)
         self._sudoku_image = None
         self._sudoku_position = None
         self._result = None
+        self._issues = []
+        self._confidences = []
+
+    @property
+    def issues(self):
+        """
+        Issues of the last extracted values, the cells of an issue are the likely misreads
+        """
+        return self._issues
+
+    @property
+    def confidences(self):
+        """
+        Confidence in [0, 1] of each extracted value, None when the recognizer does not give one
+        """
+        return self._confidences
+
+    @property
+    def sudoku_image(self):
+        """
+        Rectified image of the last extracted sudoku
+        """
+        return self._sudoku_image
+
+    @property
+    def sudoku_position(self) -> Optional[Sudoku]:
+        """
+        Cells of the last extracted sudoku in its rectified image
+        """
+        return self._sudoku_position
+
+    def extract_cells(self):
+        """
+        Locate the sudoku and cut its thresholded cells, black on white, row by row
+        :return: Array of the images of the cells of shape (81, cell height, cell width), empty if no sudoku was found
+        """
+        image = cv2.resize(self._image, (IMAGE_SIZE, IMAGE_SIZE))
+        sudoku_shape = self.find_sudoku_shape(image)
+        if sudoku_shape is None:
+            return []
+
+        self._sudoku_image, self._sudoku_position = self.rectify_sudoku(image, sudoku_shape)
+        return self.cut_cells(self._sudoku_image, self._sudoku_position)
 
     def extract_sudoku(self):
-        image = cv2.resize(self._image, (1200, 1200))
-
-        shapes = detect_possible_sudokus(image)
-        sudoku_shapes = sorted(shapes, key=lambda shape: shape.area)
-
         result = []
-        for i, sudoku_shape in enumerate(reversed(sudoku_shapes)):
-            # TODO: Implement something to check the next shape if nothing is found on the first one
-            if i > 0:
-                break
-
-            self._sudoku_image, self._sudoku_position = self._rotate_and_crop_sudoku(image, sudoku_shape)
-            ocr_image = self._prepare_image_for_ocr(self._sudoku_image)
-
-            for cell in self._sudoku_position.cells:
-                cell_image = cell.get_cell_image(ocr_image, 0.15)
-                text = tess.image_to_string(cell_image,
-                                            config="--psm 10 -c classify_bln_numeric_mode=1 --oem 1")
-                result.append(self._text_to_int(text))
-
+        confidences = []
+        for value, confidence in self._recognizer.recognize(self.extract_cells()):
+            result.append(value)
+            confidences.append(confidence)
+
+        self._confidences = confidences
+        self._issues = find_issues(result)
+        unreadable = tuple(index for index, (value, confidence) in enumerate(zip(result, confidences))
+                           if value is None and confidence == 0)
+        if unreadable:
+            self._issues.append(Issue(UNREADABLE_DIGIT, unreadable))
         return result
 
+    @staticmethod
+    def find_sudoku_shape(image) -> Optional[Shape]:
+        """
+        :return: Largest shape of the image which may be a sudoku, None if there is none
+        """
+        # TODO: Implement something to check the next shape if nothing is found on the first one
+        return max(detect_possible_sudokus(image), key=lambda shape: shape.area, default=None)
+
+    @classmethod
+    def cut_cells(cls, sudoku_image, sudoku_position: Sudoku):
+        """
+        Threshold a rectified sudoku and cut its cells, black on white, row by row
+        """
+        return sudoku_position.get_cell_images(cls._prepare_image_for_ocr(sudoku_image), CELL_MARGIN)
+
     @staticmethod
     def _prepare_image_for_ocr(sudoku_image):
         gray = cv2.cvtColor(sudoku_image, cv2.COLOR_BGR2GRAY)
@@ -49,27 +114,16 @@ class SudokuExtractor:
                                              cv2.THRESH_BINARY, 11, 2)
         return sudoku_image
 
-    @staticmethod
-    def _text_to_int(val):
-        if val in ["I", "l", "!"]:
-            # TODO has to be improved
-            # It should check the cell to see if there is a number or not
-            return 1
-
-        try:
-            num = int(val)
-        except ValueError:
-            return None
-
-        if 0 < num < 10:
-            return num
-        else:
-            return None
-
-    def _rotate_and_crop_sudoku(self, image, sudoku_shape) -> [Any, Sudoku]:
+    @classmethod
+    def rectify_sudoku(cls, image, sudoku_shape) -> [Any, Sudoku]:
+        """
+        Rotate and crop the sudoku shape of the image into a square image
+        :return: Rectified image and the cells of the sudoku in it
+        """
         # TODO: Handle case for angle oustide -90..90 range
         corners = Sudoku.sort_shape_corners(sudoku_shape)
-        length = int(self._compute_average_length(corners))
+        # A multiple of 9 so the rectified sudoku splits evenly in cells
+        length = int(cls._compute_average_length(corners)) // 9 * 9
 
         rotated_sudoku = Sudoku(Point(0, 0), Point(length, 0), Point(0, length), Point(length, length))
 
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy
+import pytesseract as tess
+
+# Tesseract settings of a single character, used when the cells are read one by one
+CELL_CONFIG = "--psm 10 -c classify_bln_numeric_mode=1 --oem 1"
+# Tesseract settings of the montage: a block of text made of digits only
+MONTAGE_CONFIG = "--psm 6 --oem 1 -c tessedit_char_whitelist=123456789"
+
+# Side in pixels of a montage tile, the cell image is scaled to fit in it within the margin. The
+# margins keep the digits of neighbouring tiles far enough apart for Tesseract to read them as
+# separate words.
+TILE_SIZE = 96
+TILE_MARGIN = 32
+TILES_PER_ROW = 9
+# Pre-classification of the empty cells, on the binary cell images black on white:
+# fraction of dark pixels below which a cell is empty without looking further
+MIN_INK_RATIO = 0.02
+# Smallest area, as a fraction of the cell, and height, as a fraction of the cell height, of the
+# connected component of a digit, the specks of noise and the leftovers of the grid lines are smaller
+MIN_DIGIT_AREA_RATIO = 0.015
+MIN_DIGIT_HEIGHT_RATIO = 0.3
+# The center of the component of a digit lies in the middle of the cell, within this fraction of its side
+DIGIT_CENTER_RATIO = 0.5
+
+# Value of a cell, None for an empty or unreadable cell, and confidence in [0, 1], None if unknown.
+# A cell holding a digit which could not be read is None with a confidence of 0.
+Recognition = Tuple[Optional[int], Optional[float]]
+
+
+def digit_bounds(cell_image) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Bounds of the digit of a binary cell image, black on white: the largest connected
+    component of dark pixels big enough, tall enough and centered
+    :return: x, y, width and height of the digit, None if the cell likely holds no digit
+    """
+    ink = cell_image < 128
+    if numpy.count_nonzero(ink) < MIN_INK_RATIO * ink.size:
+        return None
+
+    height, width = ink.shape
+    _, _, stats, centroids = cv2.connectedComponentsWithStats(ink.astype(numpy.uint8), connectivity=8)
+    low, high = (1 - DIGIT_CENTER_RATIO) / 2, (1 + DIGIT_CENTER_RATIO) / 2
+    # Component 0 is the background
+    stats, centroids = stats[1:], centroids[1:]
+    areas = stats[:, cv2.CC_STAT_AREA]
+    digits = ((areas >= MIN_DIGIT_AREA_RATIO * ink.size) &
+              (stats[:, cv2.CC_STAT_HEIGHT] >= MIN_DIGIT_HEIGHT_RATIO * height) &
+              (centroids[:, 0] >= low * width) & (centroids[:, 0] <= high * width) &
+              (centroids[:, 1] >= low * height) & (centroids[:, 1] <= high * height))
+    if not digits.any():
+        return None
+    largest = numpy.argmax(numpy.where(digits, areas, -1))
+    return tuple(int(stat) for stat in stats[largest, :cv2.CC_STAT_AREA])
+
+
+def has_digit(cell_image) -> bool:
+    """
+    Whether a binary cell image, black on white, likely holds a digit
+    """
+    return digit_bounds(cell_image) is not None
+
+
+def text_to_value(text: str) -> Optional[int]:
+    text = text.strip()
+    if text in ["I", "l", "!"]:
+        # Only the cells holding a digit are read, a vertical stroke is a 1
+        return 1
+
+    try:
+        value = int(text)
+    except ValueError:
+        return None
+
+    return value if 0 < value < 10 else None
+
+
+def read_cell(cell_image) -> Recognition:
+    """
+    Read the digit of a binary cell image with its own Tesseract call, which gives no confidence
+    """
+    if not has_digit(cell_image):
+        return None, 1.0
+    value = text_to_value(tess.image_to_string(cell_image, config=CELL_CONFIG))
+    return (value, None) if value is not None else (None, 0.0)
+
+
+def make_montage(cell_images: Sequence) -> numpy.ndarray:
+    """
+    Tile the binary cell images on a white image, TILES_PER_ROW per row, cell i being in the
+    tile at row i // TILES_PER_ROW and column i % TILES_PER_ROW
+    """
+    rows = (len(cell_images) + TILES_PER_ROW - 1) // TILES_PER_ROW
+    montage = numpy.full((rows * TILE_SIZE, TILES_PER_ROW * TILE_SIZE), 255, dtype=numpy.uint8)
+    content_size = TILE_SIZE - 2 * TILE_MARGIN
+    for position, cell_image in enumerate(cell_images):
+        y = (position // TILES_PER_ROW) * TILE_SIZE + TILE_MARGIN
+        x = (position % TILES_PER_ROW) * TILE_SIZE + TILE_MARGIN
+        montage[y:y + content_size, x:x + content_size] = cv2.resize(cell_image, (content_size, content_size),
+                                                                     interpolation=cv2.INTER_AREA)
+    return montage
+
+
+def read_montage(montage, tile_count: int, config: str = MONTAGE_CONFIG) -> List[Recognition]:
+    """
+    Read a montage with a single Tesseract call and map the words found back to their tiles.
+    A tile is read only when a single one digit word lies in it, a word spanning several tiles
+    leaves all of them unreadable rather than guessing which of its characters goes where.
+    """
+    words = [[] for _ in range(tile_count)]
+    data = tess.image_to_data(montage, config=config, output_type=tess.Output.DICT)
+    for text, confidence, left, top, width, height in zip(data["text"], data["conf"], data["left"], data["top"],
+                                                           data["width"], data["height"]):
+        text = text.strip()
+        confidence = float(confidence)
+        if not text or confidence < 0:
+            continue
+
+        rows = range(top // TILE_SIZE, (top + height - 1) // TILE_SIZE + 1)
+        cols = range(left // TILE_SIZE, min((left + width - 1) // TILE_SIZE, TILES_PER_ROW - 1) + 1)
+        single_tile = len(rows) == 1 and len(cols) == 1
+        for row in rows:
+            for col in cols:
+                position = row * TILES_PER_ROW + col
+                if position < tile_count:
+                    words[position].append((text if single_tile else None, confidence))
+
+    recognitions = []
+    for tile_words in words:
+        if len(tile_words) == 1 and tile_words[0][0] is not None and len(tile_words[0][0]) == 1:
+            text, confidence = tile_words[0]
+            value = text_to_value(text)
+            recognitions.append((value, confidence / 100) if value is not None else (None, 0.0))
+        else:
+            recognitions.append((None, 0.0))
+    return recognitions
+
+
+def recognize_cells(cell_images: Sequence) -> List[Recognition]:
+    """
+    Read the digits of binary cell images, black on white, with one Tesseract call for all
+    the cells holding a digit, the others are empty. The digits the montage did not give are
+    read again one by one rather than taken for empty cells.
+    :return: Value and confidence of each cell, in the order of the images
+    """
+    filled = [index for index, cell_image in enumerate(cell_images) if has_digit(cell_image)]
+    recognitions = [(None, 1.0)] * len(cell_images)
+    if not filled:
+        return recognitions
+
+    montage = make_montage([cell_images[index] for index in filled])
+    for index, recognition in zip(filled, read_montage(montage, len(filled))):
+        if recognition[0] is None:
+            recognition = read_cell(cell_images[index])
+        recognitions[index] = recognition
+    return recognitions
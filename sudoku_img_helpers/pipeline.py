@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+import itertools
+import os
+import queue
+import threading
+import time
+from copy import deepcopy
+from functools import partial
+from multiprocessing import Process, Queue
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import cv2
+
+from sudoku_img_helpers.elements import BOTTOM_LEFT, Sudoku
+from sudoku_img_helpers.extractor import IMAGE_SIZE, SudokuExtractor
+from sudoku_img_helpers.recognizers import get_recognizer
+from sudoku_solvers.registry import BUDGET, get_solver
+from sudoku_utils.budget import SolveBudget
+from sudoku_utils.result import SolveResult
+
+# Images queued between two stages, bounds the memory used whatever the number of images
+DEFAULT_QUEUE_SIZE = 8
+# Seconds the done jobs are waited for before checking again that no stage process died
+POLL_INTERVAL = 1.0
+# Share of the processes given to each stage, about its time per image measured with the knn
+# recognizer: decode 12ms, detect 100ms, rectify 20ms, recognize 12ms, write 50ms. The solve stage,
+# about 10ms, gets a single process.
+STAGE_WEIGHTS = (("decode", 1), ("detect", 8), ("rectify", 2), ("recognize", 2), ("write", 4))
+SOLVE_WORKERS = 1
+# The rectified sudoku goes through the queues as a JPEG until the write stage draws on it
+SUDOKU_IMAGE_FORMAT = ".jpg"
+SUDOKU_IMAGE_QUALITY = 90
+
+STAGE_TEXT = ("Stage: {name} x{workers} processed {count} images, {errors} failed, "
+              "{ms:.1f}ms per image, {throughput:.1f} images/s")
+TOTAL_TEXT = "Processed {count} images in {seconds:.1f}s, {throughput:.1f} images/s, {errors} failed"
+
+
+class Job:
+    """
+    An image going through the stages, each stage fills in its fields and releases the ones
+    no longer needed so less data goes through the queues
+    """
+    __slots__ = ("index", "path", "image", "sudoku_shape", "sudoku_image", "sudoku_position", "cell_images",
+                 "values", "confidences", "result", "output", "failed_stage", "error", "timings")
+
+    def __init__(self, index: int, path: str):
+        """
+        :param index: Position of the image in the input, makes the name of its output unique
+        """
+        self.index = index
+        self.path = path
+        self.image = None
+        self.sudoku_shape = None
+        self.sudoku_image = None
+        self.sudoku_position = None
+        self.cell_images = None
+        self.values = None
+        self.confidences = None
+        self.result = None
+        # Name of the annotated image in the output directory
+        self.output = None
+        # Stage and message of the first failure, the next stages skip the job
+        self.failed_stage = None
+        self.error = None
+        # Seconds spent by each stage on the job
+        self.timings = {}
+
+
+class Stage:
+    __slots__ = ("name", "function", "workers", "setup")
+
+    def __init__(self, name: str, function: Callable, workers: int = 1, setup: Optional[Callable] = None):
+        """
+        :param function: Called with the job and what setup returned, fills in the job
+        :param workers: Number of processes running the stage
+        :param setup: Called once by each process, for example to load a model
+        """
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.setup = setup
+
+
+def draw_values(sudoku_image, sudoku_position: Sudoku, found_values: List[Optional[int]], result: SolveResult):
+    """
+    Rectified sudoku with the values found by the solver written large and the values read written small
+    """
+    image = deepcopy(sudoku_image)
+    if result.solved:
+        solved_values = [found_value if existing_value is None else None
+                         for existing_value, found_value in zip(found_values, result.grid)]
+        sudoku_position.write_in_cells(image, solved_values, font_scale=3)
+    sudoku_position.write_in_cells(image, found_values, color=(0, 0, 255), position=BOTTOM_LEFT, font_scale=1.5)
+    return image
+
+
+def decode(job: Job, _) -> None:
+    image = cv2.imread(job.path)
+    if image is None:
+        raise ValueError("Cannot read the image")
+    job.image = cv2.resize(image, (IMAGE_SIZE, IMAGE_SIZE))
+
+
+def detect(job: Job, _) -> None:
+    job.sudoku_shape = SudokuExtractor.find_sudoku_shape(job.image)
+    if job.sudoku_shape is None:
+        raise ValueError("No sudoku found")
+
+
+def rectify(job: Job, _) -> None:
+    sudoku_image, job.sudoku_position = SudokuExtractor.rectify_sudoku(job.image, job.sudoku_shape)
+    job.cell_images = SudokuExtractor.cut_cells(sudoku_image, job.sudoku_position)
+    _, job.sudoku_image = cv2.imencode(SUDOKU_IMAGE_FORMAT, sudoku_image,
+                                       (cv2.IMWRITE_JPEG_QUALITY, SUDOKU_IMAGE_QUALITY))
+    job.image = job.sudoku_shape = None
+
+
+def recognize(job: Job, recognizer) -> None:
+    recognitions = recognizer.recognize(job.cell_images)
+    job.values = [value for value, _ in recognitions]
+    job.confidences = [confidence for _, confidence in recognitions]
+    job.cell_images = None
+    # Solving without the givens which could not be read would solve another sudoku
+    unreadable = [index for index, (value, confidence) in enumerate(recognitions) if value is None and confidence == 0]
+    if unreadable:
+        raise ValueError("Unreadable digits in cells {}".format(unreadable))
+
+
+def solve(job: Job, make_solver) -> None:
+    job.result = make_solver(job.values).solve()
+
+
+def write(job: Job, output_dir: str) -> None:
+    sudoku_image = cv2.imdecode(job.sudoku_image, cv2.IMREAD_COLOR)
+    image = draw_values(sudoku_image, job.sudoku_position, job.values, job.result)
+    # Images of different directories or extensions may share their name
+    name = os.path.splitext(os.path.basename(job.path))[0]
+    output = "{:06d}_{}.png".format(job.index, name)
+    cv2.imwrite(os.path.join(output_dir, output), image)
+    job.output = output
+    job.sudoku_image = job.sudoku_position = None
+
+
+def _make_output_dir(output_dir: str) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    return output_dir
+
+
+def _load_solver(solver: str, time_limit: Optional[float]):
+    solver_info = get_solver(solver)
+    if time_limit is not None and solver_info.supports(BUDGET):
+        # A new budget for each sudoku, its clock starts with the solver
+        return lambda values: solver_info.load()(values, budget=SolveBudget(time_limit=time_limit))
+    return solver_info.load()
+
+
+def make_stages(output_dir: str, recognizer: str, solver: str, time_limit: Optional[float] = None,
+                workers: Optional[int] = None, **recognizer_options) -> List[Stage]:
+    """
+    Stages reading, locating, rectifying, recognizing, solving and annotating the sudoku of an image
+    :param output_dir: Directory of the annotated images
+    :param workers: Number of processes shared by the stages according to STAGE_WEIGHTS, defaults to the
+    number of CPUs, each stage has at least one
+    """
+    workers = split_workers(workers or os.cpu_count())
+    return [
+        Stage("decode", decode, workers["decode"]),
+        Stage("detect", detect, workers["detect"]),
+        Stage("rectify", rectify, workers["rectify"]),
+        Stage("recognize", recognize, workers["recognize"],
+              partial(get_recognizer, recognizer, **recognizer_options)),
+        Stage("solve", solve, SOLVE_WORKERS, partial(_load_solver, solver, time_limit)),
+        Stage("write", write, workers["write"], partial(_make_output_dir, output_dir)),
+    ]
+
+
+def split_workers(workers: int) -> Dict[str, int]:
+    """
+    Share the processes left by the solve stage between the other stages according to their weight
+    """
+    total_weight = sum(weight for _, weight in STAGE_WEIGHTS)
+    available = max(workers - SOLVE_WORKERS, 0)
+    shares = {name: available * weight / total_weight for name, weight in STAGE_WEIGHTS}
+    counts = {name: max(1, int(share)) for name, share in shares.items()}
+    # The processes left by rounding down go to the largest remainders
+    left = available - sum(counts.values())
+    by_remainder = sorted(shares, key=lambda name: shares[name] - int(shares[name]), reverse=True)
+    for name in by_remainder[:max(left, 0)]:
+        counts[name] += 1
+    return counts
+
+
+def _run_stage(stage: Stage, jobs: Queue, done_jobs: Queue):
+    # A failed setup fails the jobs of the stage rather than leaving them queued forever
+    context = setup_error = None
+    if stage.setup is not None:
+        try:
+            context = stage.setup()
+        except Exception as error:
+            setup_error = "Setup failed: {}".format(error)
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+
+        if job.error is None and setup_error is not None:
+            job.failed_stage = stage.name
+            job.error = setup_error
+        elif job.error is None:
+            start = time.perf_counter()
+            try:
+                stage.function(job, context)
+            except Exception as error:
+                job.failed_stage = stage.name
+                job.error = str(error)
+            job.timings[stage.name] = time.perf_counter() - start
+        done_jobs.put(job)
+
+
+def _feed(jobs: Iterable[Job], stages: List[Stage], processes: List[List[Process]], queues: List[Queue]):
+    for job in jobs:
+        queues[0].put(job)
+    # Once all the processes of a stage are done, the processes of the next stage are told to stop
+    for stage_index, stage in enumerate(stages):
+        for _ in range(stage.workers):
+            queues[stage_index].put(None)
+        for process in processes[stage_index]:
+            process.join()
+    queues[-1].put(None)
+
+
+def run_pipeline(paths: Iterable[str], stages: List[Stage], queue_size: int = DEFAULT_QUEUE_SIZE) -> Iterator[Job]:
+    """
+    Run the stages on the images, each stage on its own processes, with bounded queues between
+    the stages. The jobs are yielded as they are done, not in the order of the paths.
+    :param paths: Paths of the images, can be a generator, it is consumed as the work progresses
+    :raises RuntimeError: If a stage process dies, for example killed for lack of memory, its job is lost
+    """
+    queues = [Queue(queue_size) for _ in range(len(stages) + 1)]
+    processes = [[Process(target=_run_stage, args=(stage, queues[index], queues[index + 1]), daemon=True)
+                  for _ in range(stage.workers)]
+                 for index, stage in enumerate(stages)]
+    for stage_processes in processes:
+        for process in stage_processes:
+            process.start()
+
+    jobs = itertools.starmap(Job, enumerate(paths))
+    feeder = threading.Thread(target=_feed, args=(jobs, stages, processes, queues), daemon=True)
+    feeder.start()
+    try:
+        while True:
+            # A job held by a dead process never comes out, the wait is bounded to notice it
+            _check_processes(stages, processes)
+            try:
+                job = queues[-1].get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if job is None:
+                break
+            yield job
+    finally:
+        for stage_processes in processes:
+            for process in stage_processes:
+                process.terminate()
+        # The jobs left in the queues are dropped instead of blocking the exit
+        for stage_queue in queues:
+            stage_queue.cancel_join_thread()
+
+
+def _check_processes(stages: List[Stage], processes: List[List[Process]]):
+    for stage, stage_processes in zip(stages, processes):
+        for process in stage_processes:
+            if not process.is_alive() and process.exitcode != 0:
+                raise RuntimeError("A process of the {} stage died with exit code {}".format(
+                    stage.name, process.exitcode))
+
+
+class StageStats:
+    """
+    Throughput of the stages computed from the timings of the jobs
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self._stages = stages
+        self._counts = {stage.name: 0 for stage in stages}
+        self._errors = {stage.name: 0 for stage in stages}
+        self._seconds = {stage.name: 0.0 for stage in stages}
+        self._start = time.perf_counter()
+        self._count = 0
+        self._failed = 0
+
+    def add(self, job: Job) -> None:
+        self._count += 1
+        self._failed += job.error is not None
+        for name, seconds in job.timings.items():
+            self._counts[name] += 1
+            self._seconds[name] += seconds
+        if job.failed_stage is not None:
+            self._errors[job.failed_stage] += 1
+
+    def summary(self) -> Dict:
+        seconds = time.perf_counter() - self._start
+        stages = {}
+        for stage in self._stages:
+            count = self._counts[stage.name]
+            stage_seconds = self._seconds[stage.name]
+            stages[stage.name] = {
+                "workers": stage.workers,
+                "count": count,
+                "errors": self._errors[stage.name],
+                "ms": stage_seconds * 1000 / count if count else 0.0,
+                # Images per second the processes of the stage can handle when kept busy
+                "throughput": stage.workers * count / stage_seconds if stage_seconds else 0.0,
+            }
+        return {
+            "count": self._count,
+            "errors": self._failed,
+            "seconds": seconds,
+            "throughput": self._count / seconds if seconds else 0.0,
+            "stages": stages,
+        }
+
+    def report(self) -> str:
+        summary = self.summary()
+        lines = [STAGE_TEXT.format(name=name, **stage) for name, stage in summary["stages"].items()]
+        lines.append(TOTAL_TEXT.format(**summary))
+        return "\n".join(lines)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy
+
+from sudoku_img_helpers.ocr import Recognition, digit_bounds, read_cell, recognize_cells
+
+TESSERACT = "tesseract"
+TESSERACT_CELLS = "tesseract_cells"
+KNN = "knn"
+
+DEFAULT_RECOGNIZER = TESSERACT
+
+# Side in pixels of the normalized digit crops compared by the k-NN recognizer
+SAMPLE_SIZE = 20
+SAMPLE_MARGIN = 2
+DEFAULT_NEIGHBORS = 3
+
+# Digits rendered as the samples of the k-NN recognizer when none are given
+SAMPLE_FONTS = (cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_PLAIN, cv2.FONT_HERSHEY_DUPLEX,
+                cv2.FONT_HERSHEY_COMPLEX, cv2.FONT_HERSHEY_TRIPLEX)
+SAMPLE_THICKNESSES = (1, 2, 3)
+SAMPLE_CELL_SIZE = 64
+
+
+class Recognizer(ABC):
+    """
+    Reads the digits of binary cell images, black on white
+    """
+
+    @abstractmethod
+    def recognize(self, cell_images: Sequence) -> List[Recognition]:
+        """
+        :return: Value and confidence of each cell, in the order of the images
+        """
+
+
+class TesseractRecognizer(Recognizer):
+    def __init__(self, batched: bool = True):
+        """
+        :param batched: Read all the cells with a single Tesseract call on a montage of the cells
+        holding a digit, otherwise call Tesseract on each of them
+        """
+        self._batched = batched
+
+    def recognize(self, cell_images: Sequence) -> List[Recognition]:
+        if self._batched:
+            return recognize_cells(cell_images)
+        return [read_cell(cell_image) for cell_image in cell_images]
+
+
+def normalize_digit(cell_image, bounds) -> numpy.ndarray:
+    """
+    Crop the digit of a binary cell image and scale it to fit in a SAMPLE_SIZE square, ink being 1
+    """
+    x, y, width, height = bounds
+    ink = (cell_image[y:y + height, x:x + width] < 128).astype(numpy.float32)
+    scale = (SAMPLE_SIZE - 2 * SAMPLE_MARGIN) / max(width, height)
+    scaled_width, scaled_height = max(1, round(width * scale)), max(1, round(height * scale))
+    digit = cv2.resize(ink, (scaled_width, scaled_height), interpolation=cv2.INTER_AREA)
+
+    sample = numpy.zeros((SAMPLE_SIZE, SAMPLE_SIZE), dtype=numpy.float32)
+    top, left = (SAMPLE_SIZE - scaled_height) // 2, (SAMPLE_SIZE - scaled_width) // 2
+    sample[top:top + scaled_height, left:left + scaled_width] = digit
+    return sample
+
+
+def _features(samples: numpy.ndarray) -> numpy.ndarray:
+    """
+    Blurred samples flattened, centered and scaled to a unit norm, their dot products are
+    their cosine similarities
+    """
+    blurred = numpy.stack([cv2.GaussianBlur(sample, (3, 3), 0) for sample in samples])
+    features = blurred.reshape(len(samples), -1)
+    features = features - features.mean(axis=1, keepdims=True)
+    norms = numpy.linalg.norm(features, axis=1, keepdims=True)
+    return features / numpy.maximum(norms, 1e-6)
+
+
+def render_samples() -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Digits 1 to 9 drawn in the OpenCV fonts, the samples used when no samples of real cells are given
+    :return: Normalized samples and their values
+    """
+    samples = []
+    values = []
+    for font in SAMPLE_FONTS:
+        for thickness in SAMPLE_THICKNESSES:
+            for value in range(1, 10):
+                text = str(value)
+                (_, unit_height), _ = cv2.getTextSize(text, font, 1, thickness)
+                scale = SAMPLE_CELL_SIZE / 2 / unit_height
+                (width, height), _ = cv2.getTextSize(text, font, scale, thickness)
+                image = numpy.full((SAMPLE_CELL_SIZE, SAMPLE_CELL_SIZE), 255, dtype=numpy.uint8)
+                origin = ((SAMPLE_CELL_SIZE - width) // 2, (SAMPLE_CELL_SIZE + height) // 2)
+                cv2.putText(image, text, origin, font, scale, 0, thickness)
+                bounds = digit_bounds(image)
+                if bounds is not None:
+                    samples.append(normalize_digit(image, bounds))
+                    values.append(value)
+    return numpy.stack(samples), numpy.array(values, dtype=numpy.int8)
+
+
+class KnnRecognizer(Recognizer):
+    """
+    In process k nearest neighbors classifier of the normalized digit crops, on their cosine
+    similarity. The empty cells are found by digit_bounds, all the others are classified with
+    a single matrix product.
+    """
+
+    def __init__(self, samples_path: Optional[str] = None, neighbors: int = DEFAULT_NEIGHBORS):
+        """
+        :param samples_path: File written by save() with samples of real cells, digits drawn in
+        the OpenCV fonts by default
+        :param neighbors: Number of neighbors voting for the value of a cell
+        """
+        if samples_path is None:
+            samples, values = render_samples()
+        else:
+            with numpy.load(samples_path) as data:
+                samples, values = data["samples"], data["values"]
+
+        self._neighbors = neighbors
+        self._samples = samples
+        self._values = values
+        self._features = _features(samples)
+
+    def fit(self, cell_images: Sequence, values: Sequence[Optional[int]]) -> int:
+        """
+        Add the digits of cells whose values are known to the samples
+        :return: Number of samples added, the cells without a value or a digit are skipped
+        """
+        samples = []
+        sample_values = []
+        for cell_image, value in zip(cell_images, values):
+            bounds = digit_bounds(cell_image) if value is not None else None
+            if bounds is not None:
+                samples.append(normalize_digit(cell_image, bounds))
+                sample_values.append(value)
+
+        if samples:
+            samples = numpy.stack(samples)
+            self._samples = numpy.concatenate((self._samples, samples))
+            self._values = numpy.concatenate((self._values, numpy.array(sample_values, dtype=numpy.int8)))
+            self._features = numpy.concatenate((self._features, _features(samples)))
+        return len(samples)
+
+    def save(self, samples_path: str) -> None:
+        numpy.savez_compressed(samples_path, samples=self._samples, values=self._values)
+
+    def recognize(self, cell_images: Sequence) -> List[Recognition]:
+        recognitions = [(None, 1.0)] * len(cell_images)
+        filled = []
+        samples = []
+        for index, cell_image in enumerate(cell_images):
+            bounds = digit_bounds(cell_image)
+            if bounds is not None:
+                filled.append(index)
+                samples.append(normalize_digit(cell_image, bounds))
+        if not filled:
+            return recognitions
+
+        similarities = _features(numpy.stack(samples)) @ self._features.T
+        neighbors = min(self._neighbors, len(self._values))
+        nearest = numpy.argpartition(-similarities, neighbors - 1, axis=1)[:, :neighbors]
+        nearest_similarities = numpy.take_along_axis(similarities, nearest, axis=1).clip(0, 1)
+        # Votes of the neighbors for each value, weighted by their similarity
+        votes = numpy.zeros((len(filled), 10), dtype=numpy.float32)
+        numpy.add.at(votes, (numpy.arange(len(filled))[:, None], self._values[nearest]), nearest_similarities)
+        found_values = votes.argmax(axis=1)
+        confidences = votes.max(axis=1) / neighbors
+
+        for index, value, confidence in zip(filled, found_values, confidences):
+            recognitions[index] = (int(value), float(confidence))
+        return recognitions
+
+
+RECOGNIZERS = {
+    TESSERACT: lambda **options: TesseractRecognizer(batched=True, **options),
+    TESSERACT_CELLS: lambda **options: TesseractRecognizer(batched=False, **options),
+    KNN: KnnRecognizer,
+}
+
+
+def get_recognizer(recognizer: Union[str, Recognizer] = DEFAULT_RECOGNIZER, **options) -> Recognizer:
+    """
+    :param recognizer: Name of a recognizer in RECOGNIZERS, or a recognizer returned as is
+    :param options: Arguments of the recognizer constructor
+    """
+    if isinstance(recognizer, Recognizer):
+        return recognizer
+    assert recognizer in RECOGNIZERS, "Unknown recognizer: {}, expected one of {}".format(
+        recognizer, ", ".join(RECOGNIZERS))
+    return RECOGNIZERS[recognizer](**options)
@@ -1,29 +1,203 @@
+import argparse
 import glob
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
 import time
-import importlib
+from typing import Dict, List, Optional
 
+from sudoku_solvers.registry import ANY_SIZE, BUDGET, get_solver, solver_names
+from sudoku_utils.budget import SolveBudget
+from sudoku_utils.corpus import LARGE_TIERS, TIERS, make_corpus
 from sudoku_utils.csv import load_sudoku
+from sudoku_utils.result import BUDGET_EXCEEDED, STATUSES
 
-RESULT_TEXT = "Sudoku solver: {} has an average time of {}ms"
+RESULT_TEXT = ("Sudoku solver: {name} [{tier}] solved {solved}/{count} puzzles, solve time min {solve[min]:.3f}ms "
+               "median {solve[median]:.3f}ms p95 {solve[p95]:.3f}ms max {solve[max]:.3f}ms, "
+               "setup median {setup[median]:.3f}ms, {budget_exceeded} over budget")
+NODES_TEXT = "    search nodes median {median:.0f} p95 {p95:.0f} max {max:.0f}"
+REGRESSION_TEXT = "Regression: {} [{}] {} {} went from {:.3f}ms to {:.3f}ms"
+FILES_TIER = "files"
+# Sudoku files shipped next to this script, found whatever the working directory
+DEFAULT_PUZZLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sudokus", "*.csv")
+EMPTY_TIER_TEXT = "No puzzles in tier [{}], skipped"
 
+NS_PER_MS = 1e6
 
-def time_solver(sudoku_solver_class, sudokus, times=10):
-    start_time = time.clock()
-    for sudoku in sudokus:
-        for _ in range(times):
-            sudoku_solver = sudoku_solver_class(sudoku)
-            sudoku_solver.solve()
 
-    return (time.clock() - start_time) / (times * len(sudokus))
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Nearest rank percentile of already sorted values
+    """
+    rank = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "min": values[0],
+        "median": statistics.median(values),
+        "p95": percentile(values, 0.95),
+        "max": values[-1],
+        "mean": statistics.mean(values),
+    }
+
+
+def time_puzzle(sudoku_solver_class, sudoku, times: int = 10, warmup: int = 1, **solver_options) -> Dict:
+    for _ in range(warmup):
+        sudoku_solver_class(sudoku, **solver_options).solve()
+
+    setup_times = []
+    solve_times = []
+    for _ in range(times):
+        start = time.perf_counter_ns()
+        sudoku_solver = sudoku_solver_class(sudoku, **solver_options)
+        constructed = time.perf_counter_ns()
+        solution = sudoku_solver.solve()
+        solved = time.perf_counter_ns()
+
+        setup_times.append((constructed - start) / NS_PER_MS)
+        solve_times.append((solved - constructed) / NS_PER_MS)
+
+    return {
+        "status": solution.status,
+        "solved": solution.solved,
+        "budget_exceeded": solution.status == BUDGET_EXCEEDED,
+        "nodes": solution.nodes,
+        "setup_ms": summarize(setup_times),
+        "solve_ms": summarize(solve_times),
+    }
+
+
+def time_solver(sudoku_solver_class, sudokus, times: int = 10, warmup: int = 1, **solver_options) -> Dict:
+    puzzles = [time_puzzle(sudoku_solver_class, sudoku, times, warmup, **solver_options) for sudoku in sudokus]
+    nodes = [puzzle["nodes"] for puzzle in puzzles if puzzle["nodes"] is not None]
+    solved = sum(puzzle["solved"] for puzzle in puzzles)
+
+    # The distributions are over the median time of each puzzle
+    return {
+        "count": len(puzzles),
+        "solved": solved,
+        "solve_rate": solved / len(puzzles),
+        "budget_exceeded": sum(puzzle["budget_exceeded"] for puzzle in puzzles),
+        "statuses": {status: sum(puzzle["status"] == status for puzzle in puzzles) for status in STATUSES},
+        "setup_ms": summarize([puzzle["setup_ms"]["median"] for puzzle in puzzles]),
+        "solve_ms": summarize([puzzle["solve_ms"]["median"] for puzzle in puzzles]),
+        "nodes": summarize(nodes) if nodes else None,
+        "puzzles": puzzles,
+    }
+
+
+def find_regressions(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, tiers in results["solvers"].items():
+        for tier, result in tiers.items():
+            if tier not in baseline["solvers"].get(name, {}):
+                continue
+            # The setup is compared too, a slower construction makes the solver slower as much
+            for times in ("setup_ms", "solve_ms"):
+                for key in ("median", "p95"):
+                    before = baseline["solvers"][name][tier][times][key]
+                    after = result[times][key]
+                    if after > before * (1 + tolerance):
+                        regressions.append(REGRESSION_TEXT.format(name, tier, times, key, before, after))
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the sudoku solvers")
+    parser.add_argument("--puzzles", default=DEFAULT_PUZZLES,
+                        help="Glob of the sudoku files, the sudokus directory next to this script by default")
+    parser.add_argument("--corpus", action="store_true",
+                        help="Use the generated tiered corpus instead of the sudoku files")
+    parser.add_argument("--tiers", default=",".join(TIERS),
+                        help="Comma separated tiers of the corpus, the tiers of larger sudokus are {}".format(
+                            ", ".join(LARGE_TIERS)))
+    parser.add_argument("--box-size", type=int, default=3,
+                        help="Box size of the sudokus, 3 for 9x9 sudokus, selects the matching corpus tier or "
+                             "sudoku files")
+    parser.add_argument("--count", type=int, default=20, help="Puzzles per tier of the corpus")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the corpus")
+    parser.add_argument("--solvers", default=",".join(solver_names()),
+                        help="Comma separated solvers of the registry, the solvers not supporting the box size "
+                             "are skipped")
+    parser.add_argument("--times", type=int, default=10, help="Timed runs per puzzle")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per puzzle")
+    parser.add_argument("--time-limit", type=float, help="Time budget in seconds of each solve")
+    parser.add_argument("--max-nodes", type=int, help="Search node budget of each solve")
+    parser.add_argument("--json", help="File to write the results to")
+    parser.add_argument("--baseline", help="Results of a previous run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Relative slow down above which a solver is reported as a regression")
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
-    sudokus = list(map(load_sudoku, glob.glob("./sudokus/*.csv")))
-    sudoku_solvers = glob.glob("sudoku_solvers/*.py")
+    args = parse_args()
+    if args.corpus:
+        tier_names = args.tiers.split(",")
+        if args.box_size != 3:
+            tier_names = [tier for tier, box_size in LARGE_TIERS.items() if box_size == args.box_size]
+        tiers = make_corpus(tier_names, args.count, args.seed)
+    else:
+        sudokus = map(load_sudoku, sorted(glob.glob(args.puzzles)))
+        tiers = {FILES_TIER: [sudoku for sudoku in sudokus if len(sudoku) == args.box_size ** 4]}
+    for tier in [tier for tier, sudokus in tiers.items() if not sudokus]:
+        print(EMPTY_TIER_TEXT.format(tier))
+        del tiers[tier]
+    sudoku_solvers = [get_solver(name) for name in args.solvers.split(",")]
+    if args.box_size != 3:
+        sudoku_solvers = [solver for solver in sudoku_solvers if solver.supports(ANY_SIZE)]
 
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "times": args.times,
+        "warmup": args.warmup,
+        "time_limit": args.time_limit,
+        "max_nodes": args.max_nodes,
+        "corpus": {"tiers": list(tiers), "count": args.count, "seed": args.seed} if args.corpus else args.puzzles,
+        "solvers": {},
+    }
     for sudoku_solver in sudoku_solvers:
-        package = importlib.import_module(sudoku_solver.replace("/", ".").replace(".py", ""))
-        average_time = time_solver(package.SudokuSolver, sudokus)
-        print(RESULT_TEXT.format(sudoku_solver.split("/")[-1], int(average_time * 1000)))
+        name = sudoku_solver.name
+        solver_class = sudoku_solver.load()
+        solver_options = {}
+        if (args.time_limit or args.max_nodes) and sudoku_solver.supports(BUDGET):
+            solver_options["budget"] = SolveBudget(time_limit=args.time_limit, max_nodes=args.max_nodes)
+
+        results["solvers"][name] = {}
+        for tier, sudokus in tiers.items():
+            result = time_solver(solver_class, sudokus, args.times, args.warmup, **solver_options)
+            results["solvers"][name][tier] = result
+            print(RESULT_TEXT.format(name=name, tier=tier, solve=result["solve_ms"], setup=result["setup_ms"],
+                                     **result))
+            if result["nodes"] is not None:
+                print(NODES_TEXT.format(**result["nodes"]))
 
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
 
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = find_regressions(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(regression)
+        if regressions:
+            sys.exit(1)
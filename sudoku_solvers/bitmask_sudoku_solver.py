@@ -0,0 +1,229 @@
+import time
+from typing import Optional
+
+from sudoku_utils.budget import SolveBudget, BudgetExceededError
+from sudoku_utils.csv import load_sudoku
+from sudoku_utils.instrumentation import SearchStats, SETUP, SEARCH
+from sudoku_utils.result import SolveResult, SOLVED, UNSOLVABLE, BUDGET_EXCEEDED
+from sudoku_utils.topology import box_size_of, get_topology
+from sudoku_utils.validation import check_sudoku
+
+# Cell ordering: row-major order or minimum remaining values first
+STATIC = "static"
+MRV = "mrv"
+
+# Value ordering: increasing values or least constraining value first
+NATURAL = "natural"
+LCV = "lcv"
+
+
+class SudokuSolver:
+    def __init__(self, values, cell_ordering: str = STATIC, value_ordering: str = NATURAL,
+                 stats: Optional[SearchStats] = None, budget: Optional[SolveBudget] = None):
+        assert cell_ordering in (STATIC, MRV), "Unknown cell ordering: {}".format(cell_ordering)
+        assert value_ordering in (NATURAL, LCV), "Unknown value ordering: {}".format(value_ordering)
+
+        setup_start = time.perf_counter()
+        self._cell_ordering = cell_ordering
+        self._value_ordering = value_ordering
+        self._stats = stats
+        self._budget = budget
+        self._nodes = 0
+
+        # The box size is given by the number of values, the topology only matters for valid sudokus
+        self._topology = topology = get_topology(box_size_of(len(values)) or 3)
+        self._values = list(values)
+        self._rows = [0] * topology.size
+        self._cols = [0] * topology.size
+        self._boxes = [0] * topology.size
+        self._empty_cells = []
+        self._issue = check_sudoku(values)
+        if self._issue is not None:
+            return
+
+        for index, value in enumerate(values):
+            row, col, box = topology.row_of[index], topology.col_of[index], topology.box_of[index]
+            if value is None:
+                self._empty_cells.append((index, row, col, box))
+                continue
+
+            bit = 1 << (value - 1)
+            self._rows[row] |= bit
+            self._cols[col] |= bit
+            self._boxes[box] |= bit
+
+        if stats is not None:
+            stats.add_time(SETUP, time.perf_counter() - setup_start)
+
+    @property
+    def nodes(self) -> int:
+        """
+        Number of values placed during the search, a measure of the search tree size
+        """
+        return self._nodes
+
+    def solve(self) -> SolveResult:
+        search_start = time.perf_counter()
+        if self._issue is not None:
+            return SolveResult(self._issue.status, nodes=0, reason=self._issue.reason, stats=self._stats)
+
+        if self._budget is not None:
+            self._budget.start()
+        # The search leaves the values it placed in the masks and MRV reorders the empty cells,
+        # both are restored after it so the sudoku can be solved again
+        masks = self._rows[:], self._cols[:], self._boxes[:]
+        empty_cells = self._empty_cells[:]
+        self._nodes = 0
+        solution = None
+        try:
+            if self._cell_ordering == MRV:
+                solved = self._search_mrv()
+            else:
+                solved = self._search_static()
+            solution = self._values[:] if solved else None
+        except BudgetExceededError as error:
+            return SolveResult(BUDGET_EXCEEDED, elapsed=time.perf_counter() - search_start, nodes=self._nodes,
+                               reason=error.reason, stats=self._stats)
+        finally:
+            self._rows[:], self._cols[:], self._boxes[:] = masks
+            self._empty_cells[:] = empty_cells
+            for index, _, _, _ in empty_cells:
+                self._values[index] = None
+            if self._stats is not None:
+                self._stats.add_time(SEARCH, time.perf_counter() - search_start)
+
+        return SolveResult(SOLVED if solved else UNSOLVABLE, solution,
+                           elapsed=time.perf_counter() - search_start, nodes=self._nodes, stats=self._stats)
+
+    def _search_static(self):
+        all_values = self._topology.all_values
+        bits_of = self._topology.bits_of
+        values = self._values
+        rows = self._rows
+        cols = self._cols
+        boxes = self._boxes
+        empty_cells = self._empty_cells
+        target = len(empty_cells)
+        order_values = self._order_values
+        lcv = self._value_ordering == LCV
+        stats = self._stats
+        budget = self._budget
+
+        def search(position):
+            if position == target:
+                return True
+
+            index, row, col, box = empty_cells[position]
+            free = ~(rows[row] | cols[col] | boxes[box]) & all_values
+            for bit in order_values(free, position, row, col, box) if lcv else bits_of(free):
+                self._nodes += 1
+                if budget is not None:
+                    budget.check(self._nodes)
+                if stats is not None:
+                    stats.guess(position, index, bit.bit_length())
+                rows[row] |= bit
+                cols[col] |= bit
+                boxes[box] |= bit
+                if search(position + 1):
+                    values[index] = bit.bit_length()
+                    return True
+                rows[row] ^= bit
+                cols[col] ^= bit
+                boxes[box] ^= bit
+                if stats is not None:
+                    stats.backtrack(position, index)
+
+            return False
+
+        return search(0)
+
+    def _search_mrv(self):
+        all_values = self._topology.all_values
+        bits_of = self._topology.bits_of
+        bit_count = self._topology.bit_count
+        size = self._topology.size
+        values = self._values
+        rows = self._rows
+        cols = self._cols
+        boxes = self._boxes
+        empty_cells = self._empty_cells
+        target = len(empty_cells)
+        order_values = self._order_values
+        lcv = self._value_ordering == LCV
+        stats = self._stats
+        budget = self._budget
+
+        def search(position):
+            if position == target:
+                return True
+
+            # Move the most constrained remaining cell at the current position
+            best_position = position
+            best_count = size + 1
+            best_free = 0
+            for candidate_position in range(position, target):
+                _, row, col, box = empty_cells[candidate_position]
+                free = ~(rows[row] | cols[col] | boxes[box]) & all_values
+                count = bit_count(free)
+                if count < best_count:
+                    best_position, best_count, best_free = candidate_position, count, free
+                    if count <= 1:
+                        break
+
+            if best_count == 0:
+                return False
+
+            empty_cells[position], empty_cells[best_position] = empty_cells[best_position], empty_cells[position]
+            index, row, col, box = empty_cells[position]
+            for bit in order_values(best_free, position, row, col, box) if lcv else bits_of(best_free):
+                self._nodes += 1
+                if budget is not None:
+                    budget.check(self._nodes)
+                if stats is not None:
+                    stats.guess(position, index, bit.bit_length())
+                rows[row] |= bit
+                cols[col] |= bit
+                boxes[box] |= bit
+                if search(position + 1):
+                    values[index] = bit.bit_length()
+                    return True
+                rows[row] ^= bit
+                cols[col] ^= bit
+                boxes[box] ^= bit
+                if stats is not None:
+                    stats.backtrack(position, index)
+
+            return False
+
+        return search(0)
+
+    def _order_values(self, free, position, row, col, box):
+        return sorted(self._topology.bits_of(free),
+                      key=lambda bit: self._count_eliminations(bit, position, row, col, box))
+
+    def _count_eliminations(self, bit, position, row, col, box):
+        """
+        Count the remaining empty peers which would lose the value bit as a candidate
+        """
+        eliminations = 0
+        for _, peer_row, peer_col, peer_box in self._empty_cells[position + 1:]:
+            if peer_row != row and peer_col != col and peer_box != box:
+                continue
+            if not (self._rows[peer_row] | self._cols[peer_col] | self._boxes[peer_box]) & bit:
+                eliminations += 1
+        return eliminations
+
+    def print_sudoku(self):
+        print(self._topology.format_grid(self._values))
+
+
+if __name__ == '__main__':
+    values = load_sudoku("../sudokus/sudoku_0.csv")
+    sudoku_solver = SudokuSolver(values, cell_ordering=MRV)
+    sudoku_solver.print_sudoku()
+    result = sudoku_solver.solve()
+    if result.solved:
+        sudoku_solver.print_sudoku()
+    else:
+        print("No solution could be found: {}".format(result.status))
+    print("Search nodes: {}".format(result.nodes))
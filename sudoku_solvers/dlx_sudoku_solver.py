@@ -0,0 +1,274 @@
+import time
+from typing import List, Optional
+
+from sudoku_utils.budget import SolveBudget, BudgetExceededError
+from sudoku_utils.csv import load_sudoku
+from sudoku_utils.result import SolveResult, SOLVED, UNSOLVABLE, BUDGET_EXCEEDED
+from sudoku_utils.topology import ALL_VALUES, BITS_OF, ROW_OF, COL_OF, BOX_OF, STANDARD
+from sudoku_utils.validation import check_sudoku
+
+ROOT = 0
+
+
+def _check_limit(limit: Optional[int]) -> None:
+    if limit is not None and limit < 1:
+        raise ValueError("The solution limit must be at least 1, got {}".format(limit))
+
+
+class SudokuSolver:
+    """
+    Exact cover solver using Knuth's Algorithm X on dancing links.
+
+    Each column is one constraint: a cell holds a value, a row, a column and a box contains each value once.
+    Each matrix row is a candidate value of an empty cell. The constraints already satisfied by the givens
+    and the candidates contradicting them are left out of the matrix.
+    """
+
+    def __init__(self, values, budget: Optional[SolveBudget] = None):
+        self._values = list(values)
+        self._budget = budget
+        self._exceeded = None
+        self._nodes = 0
+        self._issue = check_sudoku(values, box_size=3)
+        if self._issue is not None:
+            return
+
+        rows = [0] * 9
+        cols = [0] * 9
+        boxes = [0] * 9
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+            bit = 1 << (value - 1)
+            rows[ROW_OF[index]] |= bit
+            cols[COL_OF[index]] |= bit
+            boxes[BOX_OF[index]] |= bit
+
+        # Constraint identifiers of the columns still to be covered
+        constraints = [("cell", index) for index in range(81) if values[index] is None]
+        for unit_name, masks in (("row", rows), ("col", cols), ("box", boxes)):
+            for unit in range(9):
+                constraints += [(unit_name, unit, bit) for bit in BITS_OF[ALL_VALUES & ~masks[unit]]]
+
+        # Node 0 is the root, nodes 1..len(constraints) the column headers
+        header_count = len(constraints) + 1
+        self._left = [index - 1 for index in range(header_count)]
+        self._right = [index + 1 for index in range(header_count)]
+        self._left[ROOT] = header_count - 1
+        self._right[header_count - 1] = ROOT
+        self._up = list(range(header_count))
+        self._down = list(range(header_count))
+        self._column = list(range(header_count))
+        self._size = [0] * header_count
+        # Cell index and value of the candidate each node belongs to
+        self._candidate = [None] * header_count
+
+        header_of = {constraint: header for header, constraint in enumerate(constraints, 1)}
+        for index in range(81):
+            if values[index] is not None:
+                continue
+            row, col, box = ROW_OF[index], COL_OF[index], BOX_OF[index]
+            free = ALL_VALUES & ~(rows[row] | cols[col] | boxes[box])
+            for bit in BITS_OF[free]:
+                headers = (header_of[("cell", index)], header_of[("row", row, bit)],
+                           header_of[("col", col, bit)], header_of[("box", box, bit)])
+                self._add_candidate(headers, (index, bit.bit_length()))
+
+    def _add_candidate(self, headers, candidate):
+        first = len(self._column)
+        for offset, header in enumerate(headers):
+            node = first + offset
+            self._left.append(first + (offset - 1) % len(headers))
+            self._right.append(first + (offset + 1) % len(headers))
+            self._up.append(self._up[header])
+            self._down.append(header)
+            self._down[self._up[header]] = node
+            self._up[header] = node
+            self._column.append(header)
+            self._candidate.append(candidate)
+            self._size[header] += 1
+
+    @property
+    def nodes(self) -> int:
+        """
+        Number of candidates selected during the searches, a measure of the search tree size
+        """
+        return self._nodes
+
+    def solve(self, count_limit: Optional[int] = None) -> SolveResult:
+        """
+        :param count_limit: Count the solutions up to this number, the grid being the first solution found.
+            By default the search stops at the first solution without counting.
+        """
+        _check_limit(count_limit)
+        start = time.perf_counter()
+        if self._issue is not None:
+            return SolveResult(self._issue.status, nodes=0, reason=self._issue.reason)
+
+        nodes = self._nodes
+        count, solutions = self._search(limit=1 if count_limit is None else count_limit, keep=1)
+        if solutions:
+            self._values = solutions[0]
+        if self._exceeded is not None:
+            status = BUDGET_EXCEEDED
+        else:
+            status = SOLVED if solutions else UNSOLVABLE
+        return SolveResult(status, self._values[:] if solutions else None,
+                           solution_count=None if count_limit is None else count,
+                           elapsed=time.perf_counter() - start, nodes=self._nodes - nodes, reason=self._exceeded)
+
+    def count_solutions(self, limit: Optional[int] = None) -> int:
+        """
+        Count the solutions of the sudoku
+        :param limit: Stop searching once this number of solutions is found
+        :return: Number of solutions found, at most limit, fewer if the budget was exceeded
+        """
+        _check_limit(limit)
+        count, _ = self._search(limit=limit, keep=0)
+        return count
+
+    def is_unique(self) -> Optional[bool]:
+        """
+        :return: Whether the sudoku has exactly one solution, None if the budget was exceeded before knowing
+        """
+        count = self.count_solutions(limit=2)
+        if self._exceeded is not None:
+            return None
+        return count == 1
+
+    def find_solutions(self, limit: Optional[int] = None) -> List[List[int]]:
+        """
+        :return: Solutions found, at most limit, fewer if the budget was exceeded
+        """
+        _check_limit(limit)
+        _, solutions = self._search(limit=limit, keep=limit)
+        return solutions
+
+    def _search(self, limit, keep):
+        """
+        :return: Number of solutions found and the first keep solutions, all of them if keep is None
+        """
+        solutions = []
+        selected = []
+
+        def record():
+            if keep is None or len(solutions) < keep:
+                values = self._values[:]
+                for node in selected:
+                    index, value = self._candidate[node]
+                    values[index] = value
+                solutions.append(values)
+
+        count = self._run(limit, selected, record if keep != 0 else None)
+        return count, solutions
+
+    def _run(self, limit, selected, record):
+        """
+        Run Algorithm X, calling record on every solution with the selected nodes
+        :return: Number of solutions found
+        """
+        self._exceeded = None
+        if self._issue is not None:
+            return 0
+
+        budget = self._budget
+        if budget is not None:
+            budget.start()
+        left, right, up, down = self._left, self._right, self._up, self._down
+        column, size = self._column, self._size
+        count = 0
+
+        def cover(header):
+            right[left[header]] = right[header]
+            left[right[header]] = left[header]
+            node = down[header]
+            while node != header:
+                other = right[node]
+                while other != node:
+                    up[down[other]] = up[other]
+                    down[up[other]] = down[other]
+                    size[column[other]] -= 1
+                    other = right[other]
+                node = down[node]
+
+        def uncover(header):
+            node = up[header]
+            while node != header:
+                other = left[node]
+                while other != node:
+                    size[column[other]] += 1
+                    up[down[other]] = other
+                    down[up[other]] = other
+                    other = left[other]
+                node = up[node]
+            right[left[header]] = header
+            left[right[header]] = header
+
+        def search():
+            nonlocal count
+            if right[ROOT] == ROOT:
+                count += 1
+                if record is not None:
+                    record()
+                return limit is not None and count >= limit
+
+            # Branch on the constraint with the fewest candidates
+            header = right[ROOT]
+            best_header, best_size = header, size[header]
+            header = right[header]
+            while header != ROOT and best_size > 1:
+                if size[header] < best_size:
+                    best_header, best_size = header, size[header]
+                header = right[header]
+
+            if best_size == 0:
+                return False
+
+            header = best_header
+            cover(header)
+            node = down[header]
+            stop = False
+            while node != header and not stop:
+                self._nodes += 1
+                if budget is not None:
+                    try:
+                        budget.check(self._nodes)
+                    except BudgetExceededError as error:
+                        # Stopping like after the last solution keeps the links restored
+                        self._exceeded = error.reason
+                        stop = True
+                        break
+                selected.append(node)
+                other = right[node]
+                while other != node:
+                    cover(column[other])
+                    other = right[other]
+
+                stop = search()
+
+                other = left[node]
+                while other != node:
+                    uncover(column[other])
+                    other = left[other]
+                selected.pop()
+                node = down[node]
+            uncover(header)
+            return stop
+
+        search()
+        return count
+
+    def print_sudoku(self):
+        print(STANDARD.format_grid(self._values))
+
+
+if __name__ == '__main__':
+    values = load_sudoku("../sudokus/sudoku_0.csv")
+    sudoku_solver = SudokuSolver(values)
+    sudoku_solver.print_sudoku()
+    result = sudoku_solver.solve(count_limit=2)
+    if result.solved:
+        sudoku_solver.print_sudoku()
+    else:
+        print("No solution could be found: {}".format(result.status))
+    print("Unique solution: {}".format(result.solution_count == 1))
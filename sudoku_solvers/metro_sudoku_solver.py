@@ -1,4 +1,11 @@
+import time
+
+from sudoku_utils.budget import BudgetExceededError
 from sudoku_utils.csv import load_sudoku
+from sudoku_utils.instrumentation import SETUP, SEARCH
+from sudoku_utils.result import SolveResult, SOLVED, UNSOLVABLE, BUDGET_EXCEEDED
+from sudoku_utils.topology import PEERS, STANDARD
+from sudoku_utils.validation import check_sudoku
 
 SUDOKU_STR = """
 =======================================
@@ -23,47 +30,27 @@ SUDOKU_STR = """
 """
 
 
+# Peers of each cell coming after it, the cells weighted by an empty cell when it is set
+NEXT_PEERS = tuple(tuple(peer for peer in PEERS[index] if peer > index) for index in range(81))
+VALUES = tuple(range(1, STANDARD.size + 1))
+
+
 class Cell:
-    def __init__(self, row, col, square):
-        row.add_cell(self)
-        col.add_cell(self)
-        square.add_cell(self)
-        self._row = row
-        self._col = col
-        self._square = square
+    def __init__(self):
         self.value = None
-        self._possible_values = [1, 2, 3, 4, 5, 6, 7, 8, 9]
-        self._weight_values = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+        self._possible_values = list(VALUES)
+        self._weight_values = [0] * (STANDARD.size + 1)
         self._tried_values = []
-        self._linked_cells = []
+        self._linked_cells = ()
 
     def __str__(self):
         return str(self.value)
 
-    def compute_next_linked_cells(self):
-        self_index = self._row.cells.index(self)
-        self._linked_cells = self._row.cells[self_index + 1:]
-
-        self_index = self._col.cells.index(self)
-        for cell in self._col.cells[self_index + 1:]:
-            if self._linked_cells.count(cell) == 0:
-                self._linked_cells.append(cell)
-
-        self_index = self._square.cells.index(self)
-        for cell in self._square.cells[self_index + 1:]:
-            if self._linked_cells.count(cell) == 0:
-                self._linked_cells.append(cell)
-
-    def compute_all_linked_cells(self):
-        self._linked_cells = self._row.cells[:]
-
-        for cell in self._col.cells:
-            if self._linked_cells.count(cell) == 0:
-                self._linked_cells.append(cell)
-
-        for cell in self._square.cells:
-            if self._linked_cells.count(cell) == 0:
-                self._linked_cells.append(cell)
+    def link(self, cells):
+        """
+        :param cells: Cells whose weights change with the value of this cell
+        """
+        self._linked_cells = cells
 
     def increase_weight(self, value):
         if self.value is not None:
@@ -114,62 +101,83 @@ class Cell:
         self.value = None
 
 
-class CellGroup:
-    def __init__(self):
-        self.cells = []
-
-    def add_cell(self, cell):
-        self.cells.append(cell)
-
-
 class SudokuSolver:
-    def __init__(self, values):
-        assert len(values) == 81, "The values are expected in one array"
-
-        self._rows = [CellGroup() for _ in range(9)]
-        self._cols = [CellGroup() for _ in range(9)]
-        self._squares = [CellGroup() for _ in range(9)]
-
+    def __init__(self, values, stats=None, budget=None):
+        setup_start = time.perf_counter()
+        self._stats = stats
+        self._budget = budget
         self._cells = []
-        for row_index in range(9):
-            for col_index in range(9):
-                row = self._rows[row_index]
-                col = self._cols[col_index]
-                square = self._squares[col_index // 3 + (row_index // 3) * 3]
-                self._cells.append(Cell(row, col, square))
-
         self._modifiable_cells = []
+        self._modifiable_indices = []
+        # Invalid or contradicting givens are rejected here, the search would exhaust the whole tree
+        self._issue = check_sudoku(values, box_size=3)
+        if self._issue is not None:
+            return
+
+        cells = self._cells = [Cell() for _ in range(81)]
         for index, value in enumerate(values):
+            cell = cells[index]
             if value is None:
-                self._modifiable_cells.append(self._cells[index])
-                self._cells[index].compute_next_linked_cells()
+                self._modifiable_cells.append(cell)
+                self._modifiable_indices.append(index)
+                cell.link([cells[peer] for peer in NEXT_PEERS[index]])
             else:
-                self._cells[index].value = value
-                self._cells[index].compute_all_linked_cells()
+                cell.value = value
 
+        # The givens are never reset, their peers are only weighted once
         for index, value in enumerate(values):
             if value is not None:
-                self._cells[index].increase_weight_others(value)
-
-    def solve(self):
+                for peer in PEERS[index]:
+                    cells[peer].increase_weight(value)
+
+        if stats is not None:
+            stats.add_time(SETUP, time.perf_counter() - setup_start)
+
+    def solve(self) -> SolveResult:
+        if self._issue is not None:
+            return SolveResult(self._issue.status, nodes=0, reason=self._issue.reason, stats=self._stats)
+
+        search_start = time.perf_counter()
+        stats = self._stats
+        budget = self._budget
+        if budget is not None:
+            budget.start()
+        nodes = 0
         index = 0
         target = len(self._modifiable_cells)
         while index < target:
             cell = self._modifiable_cells[index]
+            nodes += 1
+            if budget is not None:
+                try:
+                    budget.check(nodes)
+                except BudgetExceededError as error:
+                    if stats is not None:
+                        stats.add_time(SEARCH, time.perf_counter() - search_start)
+                    return SolveResult(BUDGET_EXCEEDED, elapsed=time.perf_counter() - search_start, nodes=nodes,
+                                       reason=error.reason, stats=stats)
 
             if cell.set_next_possible():
+                if stats is not None:
+                    stats.guess(index, self._modifiable_indices[index], cell.value)
                 index += 1
                 continue
             else:
                 cell.reset()
+                if stats is not None:
+                    stats.backtrack(index, self._modifiable_indices[index])
                 index -= 1
                 if index < 0:
                     break
 
+        elapsed = time.perf_counter() - search_start
+        if stats is not None:
+            stats.add_time(SEARCH, elapsed)
+
         if index == target:
-            return [cell.value for cell in self._cells]
-        else:
-            print("No solution could be found")
+            return SolveResult(SOLVED, [cell.value for cell in self._cells], elapsed=elapsed, nodes=nodes,
+                               stats=stats)
+        return SolveResult(UNSOLVABLE, elapsed=elapsed, nodes=nodes, stats=stats)
 
     def print_sudoku(self):
         print(SUDOKU_STR.format(*self._cells))
@@ -179,5 +187,8 @@ if __name__ == '__main__':
     values = load_sudoku("../sudokus/sudoku_0.csv")
     sudoku_solver = SudokuSolver(values)
     sudoku_solver.print_sudoku()
-    sudoku_solver.solve()
-    sudoku_solver.print_sudoku()
+    result = sudoku_solver.solve()
+    if result.solved:
+        sudoku_solver.print_sudoku()
+    else:
+        print("No solution could be found: {}".format(result.status))
@@ -0,0 +1,129 @@
+import time
+from typing import Tuple
+
+import numpy
+
+from sudoku_solvers.bitmask_sudoku_solver import SudokuSolver as BacktrackingSudokuSolver, MRV
+from sudoku_utils import topology
+from sudoku_utils.csv import load_sudoku
+from sudoku_utils.result import SolveResult, SOLVED, UNSOLVABLE
+from sudoku_utils.validation import check_sudoku
+
+ALL_VALUES = numpy.uint16(topology.ALL_VALUES)
+VALUE_BITS = numpy.array([1 << shift for shift in range(9)], dtype=numpy.uint16)
+# Candidate mask of a cell from its value, 0 being an empty cell
+MASK_OF_VALUE = numpy.array([topology.ALL_VALUES] + [1 << shift for shift in range(9)], dtype=numpy.uint16)
+# Value of a cell from its candidate mask, 0 when the mask is not a single value
+VALUE_OF_MASK = numpy.zeros(topology.ALL_VALUES + 1, dtype=numpy.uint8)
+VALUE_OF_MASK[VALUE_BITS] = numpy.arange(1, 10)
+BIT_COUNT = numpy.array(topology.BIT_COUNT, dtype=numpy.uint8)
+
+UNIT_CELLS = numpy.array(topology.UNITS, dtype=numpy.intp)
+CELL_UNITS = numpy.array([(topology.ROW_OF[index], 9 + topology.COL_OF[index], 18 + topology.BOX_OF[index])
+                          for index in range(81)], dtype=numpy.intp)
+
+DEFAULT_CHUNK_SIZE = 4096
+
+
+def propagate_batch(candidates: numpy.ndarray) -> numpy.ndarray:
+    """
+    Apply naked and hidden singles to a fixpoint on every grid of the batch
+    :param candidates: (N, 81) uint16 candidate masks, modified in place
+    :return: (N,) bool array, True for the grids with a contradiction
+    """
+    contradicted = numpy.zeros(len(candidates), dtype=bool)
+    # Only the grids which changed during the last pass are propagated again
+    active = numpy.arange(len(candidates))
+    while active.size:
+        current = candidates[active]
+        counts = BIT_COUNT[current]
+        singles = numpy.where(counts == 1, current, 0).astype(numpy.uint16)
+
+        # Values fixed in each unit, two equal values in a unit is a contradiction
+        unit_singles = singles[:, UNIT_CELLS]
+        single_counts = ((unit_singles[..., numpy.newaxis] & VALUE_BITS) != 0).sum(axis=2)
+        duplicated = (single_counts > 1).any(axis=(1, 2))
+        unit_used = numpy.bitwise_or.reduce(unit_singles, axis=2)
+        peers_used = numpy.bitwise_or.reduce(unit_used[:, CELL_UNITS], axis=2)
+        reduced = numpy.where(counts == 1, current, current & ~peers_used)
+
+        # Values with a single possible cell in a unit, a value without any cell is a contradiction
+        places = ((reduced[:, UNIT_CELLS][..., numpy.newaxis] & VALUE_BITS) != 0).sum(axis=2)
+        missing = (places == 0).any(axis=(1, 2))
+        unit_hidden = ((places == 1) * VALUE_BITS).sum(axis=2).astype(numpy.uint16)
+        hidden = reduced & numpy.bitwise_or.reduce(unit_hidden[:, CELL_UNITS], axis=2)
+        conflicting = (BIT_COUNT[hidden] > 1).any(axis=1)
+        reduced = numpy.where(hidden != 0, hidden, reduced)
+
+        contradiction = duplicated | missing | conflicting | (reduced == 0).any(axis=1)
+        changed = (reduced != current).any(axis=1)
+        candidates[active] = reduced
+        contradicted[active] |= contradiction
+        active = active[changed & ~contradiction]
+
+    return contradicted
+
+
+def solve_batch(puzzles: numpy.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Solve a batch of sudokus, the propagation is vectorized over the batch and only
+    the grids it does not solve are searched one by one
+    :param puzzles: (N, 81) uint8 array, 0 being an empty cell
+    :param chunk_size: Number of grids propagated together, bounds the memory used
+    :return: (N, 81) uint8 solutions, 0 filled for unsolvable grids, and (N,) bool array of the solved grids
+    """
+    puzzles = numpy.asarray(puzzles, dtype=numpy.uint8)
+    assert puzzles.ndim == 2 and puzzles.shape[1] == 81, "The puzzles are expected as an (N, 81) array"
+    assert puzzles.size == 0 or puzzles.max() <= 9, "The values are expected between 0 and 9"
+
+    solutions = numpy.zeros_like(puzzles)
+    solved = numpy.zeros(len(puzzles), dtype=bool)
+    for start in range(0, len(puzzles), chunk_size):
+        candidates = MASK_OF_VALUE[puzzles[start:start + chunk_size]]
+        contradicted = propagate_batch(candidates)
+        values = VALUE_OF_MASK[candidates]
+
+        complete = (values != 0).all(axis=1) & ~contradicted
+        solutions[start:start + chunk_size][complete] = values[complete]
+        solved[start:start + chunk_size] = complete
+
+        for offset in numpy.flatnonzero(~complete & ~contradicted):
+            grid = [None if value == 0 else int(value) for value in values[offset]]
+            result = BacktrackingSudokuSolver(grid, cell_ordering=MRV).solve()
+            if result.solved:
+                solutions[start + offset] = result.grid
+                solved[start + offset] = True
+
+    return solutions, solved
+
+
+class SudokuSolver:
+    def __init__(self, values):
+        self._values = list(values)
+        self._issue = check_sudoku(values, box_size=3)
+
+    def solve(self) -> SolveResult:
+        if self._issue is not None:
+            return SolveResult(self._issue.status, reason=self._issue.reason)
+
+        start = time.perf_counter()
+        solutions, solved = solve_batch(numpy.array([[0 if value is None else value for value in self._values]]))
+        elapsed = time.perf_counter() - start
+        if not solved[0]:
+            return SolveResult(UNSOLVABLE, elapsed=elapsed)
+        self._values = solutions[0].tolist()
+        return SolveResult(SOLVED, self._values[:], elapsed=elapsed)
+
+    def print_sudoku(self):
+        print(topology.STANDARD.format_grid(self._values))
+
+
+if __name__ == '__main__':
+    values = load_sudoku("../sudokus/sudoku_0.csv")
+    sudoku_solver = SudokuSolver(values)
+    sudoku_solver.print_sudoku()
+    result = sudoku_solver.solve()
+    if result.solved:
+        sudoku_solver.print_sudoku()
+    else:
+        print("No solution could be found: {}".format(result.status))
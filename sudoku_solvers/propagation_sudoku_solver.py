@@ -0,0 +1,145 @@
+import time
+from typing import Dict, Iterable, Optional
+
+from sudoku_utils.budget import SolveBudget, BudgetExceededError
+from sudoku_utils.csv import load_sudoku
+from sudoku_utils.instrumentation import SearchStats, SETUP, SEARCH
+from sudoku_utils.propagation import Propagator, ALL_RULES
+from sudoku_utils.result import SolveResult, SOLVED, UNSOLVABLE, BUDGET_EXCEEDED
+from sudoku_utils.topology import box_size_of, get_topology
+from sudoku_utils.validation import check_sudoku
+
+
+class SudokuSolver:
+    """
+    Propagation and MRV search on candidate masks, for sudokus of any box size
+    """
+
+    def __init__(self, values, rules: Iterable[str] = ALL_RULES, stats: Optional[SearchStats] = None,
+                 budget: Optional[SolveBudget] = None):
+        setup_start = time.perf_counter()
+        # The box size is given by the number of values, the topology only matters for valid sudokus
+        self._topology = get_topology(box_size_of(len(values)) or 3)
+        self._propagator = Propagator(rules, self._topology.box_size)
+        self._stats = stats
+        self._budget = budget
+        self._nodes = 0
+
+        self._values = list(values)
+        self._issue = check_sudoku(values)
+        if self._issue is not None:
+            return
+
+        all_values = self._topology.all_values
+        self._candidates = [all_values if value is None else 1 << (value - 1) for value in values]
+        # The givens are propagated by solve, often most of the work, so the budget bounds it
+        self._givens = [index for index, value in enumerate(values) if value is not None]
+        if stats is not None:
+            stats.add_time(SETUP, time.perf_counter() - setup_start)
+
+    @property
+    def nodes(self) -> int:
+        """
+        Number of values placed during the search, a measure of the search tree size
+        """
+        return self._nodes
+
+    @property
+    def fired_rules(self) -> Dict[str, int]:
+        """
+        Number of placements or eliminations made by each propagation rule
+        """
+        return self._propagator.fired
+
+    @property
+    def propagation_calls(self) -> int:
+        return self._propagator.calls
+
+    def solve(self) -> SolveResult:
+        if self._issue is not None:
+            return SolveResult(self._issue.status, nodes=0, reason=self._issue.reason, stats=self._stats)
+
+        search_start = time.perf_counter()
+        if self._budget is not None:
+            self._budget.start()
+        try:
+            # Each solve starts again from the givens, the values hold the solution once found
+            candidates = self._candidates[:]
+            values = [None] * self._topology.cell_count
+            for index in self._givens:
+                values[index] = self._values[index]
+            # A contradiction while propagating the givens proves there is no solution
+            result = None
+            if self._propagate(candidates, values, self._givens):
+                result = self._search(candidates, values, 0)
+        except BudgetExceededError as error:
+            return SolveResult(BUDGET_EXCEEDED, elapsed=time.perf_counter() - search_start, nodes=self._nodes,
+                               reason=error.reason, stats=self._stats)
+        finally:
+            if self._stats is not None:
+                self._stats.add_time(SEARCH, time.perf_counter() - search_start)
+
+        elapsed = time.perf_counter() - search_start
+        if result is None:
+            return SolveResult(UNSOLVABLE, elapsed=elapsed, nodes=self._nodes, stats=self._stats)
+        self._values = result
+        return SolveResult(SOLVED, self._values[:], elapsed=elapsed, nodes=self._nodes, stats=self._stats)
+
+    def _propagate(self, candidates, values, assigned):
+        if self._stats is None:
+            return self._propagator.propagate(candidates, values, assigned)
+
+        start = time.perf_counter()
+        consistent = self._propagator.propagate(candidates, values, assigned)
+        self._stats.propagation(time.perf_counter() - start)
+        return consistent
+
+    def _search(self, candidates, values, depth):
+        bit_count = self._topology.bit_count
+        best_index = None
+        best_count = self._topology.size + 1
+        for index in range(self._topology.cell_count):
+            if values[index] is None:
+                count = bit_count(candidates[index])
+                if count < best_count:
+                    best_index, best_count = index, count
+                    if count == 1:
+                        break
+
+        if best_index is None:
+            return values
+
+        for bit in self._topology.bits_of(candidates[best_index]):
+            self._nodes += 1
+            if self._budget is not None:
+                self._budget.check(self._nodes)
+            if self._stats is not None:
+                self._stats.guess(depth, best_index, bit.bit_length())
+            next_candidates = candidates[:]
+            next_values = values[:]
+            next_candidates[best_index] = bit
+            next_values[best_index] = bit.bit_length()
+            if self._propagate(next_candidates, next_values, [best_index]):
+                result = self._search(next_candidates, next_values, depth + 1)
+                if result is not None:
+                    return result
+            if self._stats is not None:
+                self._stats.backtrack(depth, best_index)
+
+        return None
+
+    def print_sudoku(self):
+        print(self._topology.format_grid(self._values))
+
+
+if __name__ == '__main__':
+    values = load_sudoku("../sudokus/sudoku_0.csv")
+    sudoku_solver = SudokuSolver(values)
+    sudoku_solver.print_sudoku()
+    result = sudoku_solver.solve()
+    if result.solved:
+        sudoku_solver.print_sudoku()
+    else:
+        print("No solution could be found: {}".format(result.status))
+    print("Search nodes: {}".format(result.nodes))
+    print("Fired rules: {}".format(sudoku_solver.fired_rules))
@@ -0,0 +1,91 @@
+import importlib
+from functools import partial
+from typing import Dict, Iterable, List, Optional
+
+# Capabilities of the solvers
+COUNTING = "counting"  # solve(count_limit=...) counts the solutions
+BATCH = "batch"  # the module has solve_batch(puzzles) solving a NumPy array of puzzles at once
+ANY_SIZE = "any_size"  # solves sudokus of any box size, the others only solve 9x9 sudokus
+BUDGET = "budget"  # the constructor takes a budget=SolveBudget
+STATS = "stats"  # the constructor takes a stats=SearchStats
+
+CAPABILITIES = (COUNTING, BATCH, ANY_SIZE, BUDGET, STATS)
+
+
+class SolverInfo:
+    """
+    Name, module and capabilities of a solver, the module is only imported by load()
+    """
+    __slots__ = ("name", "module", "capabilities", "description", "options")
+
+    def __init__(self, name: str, module: str, capabilities: Iterable[str], description: str,
+                 options: Optional[Dict] = None):
+        """
+        :param options: Constructor arguments the solver is registered with, applied by load()
+        """
+        unknown = set(capabilities).difference(CAPABILITIES)
+        assert not unknown, "Unknown capabilities: {}".format(", ".join(sorted(unknown)))
+
+        self.name = name
+        self.module = module
+        self.capabilities = frozenset(capabilities)
+        self.description = description
+        self.options = options or {}
+
+    def supports(self, *capabilities: str) -> bool:
+        return self.capabilities.issuperset(capabilities)
+
+    def load_module(self):
+        return importlib.import_module(self.module)
+
+    def load(self):
+        """
+        :return: SudokuSolver class of the solver, with the registered options applied if there are any
+        """
+        solver_class = self.load_module().SudokuSolver
+        return partial(solver_class, **self.options) if self.options else solver_class
+
+    def __repr__(self):
+        return "SolverInfo(name={}, capabilities={})".format(self.name, sorted(self.capabilities))
+
+
+# Fastest first by the mean setup and solve time of a puzzle summed over the easy, hard, minimal and
+# adversarial tiers of the 9x9 benchmark corpus
+SOLVERS = (
+    SolverInfo("dlx", "sudoku_solvers.dlx_sudoku_solver", (COUNTING, BUDGET),
+               "Algorithm X on dancing links"),
+    SolverInfo("numpy_batch", "sudoku_solvers.numpy_batch_sudoku_solver", (BATCH,),
+               "Vectorized propagation of many puzzles with a backtracking fallback"),
+    SolverInfo("propagation", "sudoku_solvers.propagation_sudoku_solver", (ANY_SIZE, BUDGET, STATS),
+               "Constraint propagation with MRV search"),
+    SolverInfo("bitmask", "sudoku_solvers.bitmask_sudoku_solver", (ANY_SIZE, BUDGET, STATS),
+               "Backtracking on bitmasks with MRV ordering", {"cell_ordering": "mrv"}),
+    SolverInfo("metro", "sudoku_solvers.metro_sudoku_solver", (BUDGET, STATS),
+               "Original backtracking on weighted cells"),
+)
+
+_SOLVERS_BY_NAME = {solver.name: solver for solver in SOLVERS}
+
+
+def solver_names() -> List[str]:
+    return [solver.name for solver in SOLVERS]
+
+
+def get_solver(name: str) -> SolverInfo:
+    assert name in _SOLVERS_BY_NAME, "Unknown solver: {}, expected one of {}".format(name, ", ".join(solver_names()))
+    return _SOLVERS_BY_NAME[name]
+
+
+def find_solvers(*capabilities: str) -> List[SolverInfo]:
+    """
+    :return: Solvers supporting all the capabilities, fastest first
+    """
+    return [solver for solver in SOLVERS if solver.supports(*capabilities)]
+
+
+def select_solver(*capabilities: str) -> Optional[SolverInfo]:
+    """
+    :return: Fastest solver supporting all the capabilities, None if there is none
+    """
+    solvers = find_solvers(*capabilities)
+    return solvers[0] if solvers else None
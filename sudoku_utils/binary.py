@@ -0,0 +1,68 @@
+import struct
+from typing import Iterable, Iterator, List, Optional
+
+import numpy
+
+from sudoku_utils.csv import iter_sudokus, save_sudokus
+
+# Header: magic, version, reserved, number of cells per puzzle, number of puzzles
+HEADER = struct.Struct("<4sBBHQ")
+MAGIC = b"SDKB"
+VERSION = 1
+
+
+def save_binary(filename: str, sudokus: Iterable[List[Optional[int]]]) -> int:
+    """
+    Write the sudokus as fixed size records of one byte per cell, 0 being an empty cell.
+    Puzzle i is found at offset HEADER.size + i * cells so no separate index is needed.
+    :return: Number of sudokus written
+    """
+    count = 0
+    cells = None
+    with open(filename, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        for values in sudokus:
+            if cells is None:
+                cells = len(values)
+            assert len(values) == cells, "All the sudokus are expected to have {} cells".format(cells)
+            file.write(bytes(0 if value is None else value for value in values))
+            count += 1
+
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, 0, cells or 0, count))
+    return count
+
+
+def load_binary(filename: str) -> numpy.ndarray:
+    """
+    Map a binary sudoku file in memory without reading it
+    :return: Read-only (N, cells) uint8 view of the file, 0 being an empty cell
+    """
+    with open(filename, "rb") as file:
+        magic, version, _, cells, count = HEADER.unpack(file.read(HEADER.size))
+    assert magic == MAGIC, "{} is not a binary sudoku file".format(filename)
+    assert version == VERSION, "Unsupported binary sudoku version {}".format(version)
+
+    if count == 0:
+        return numpy.zeros((0, cells), dtype=numpy.uint8)
+    return numpy.memmap(filename, dtype=numpy.uint8, mode="r", offset=HEADER.size, shape=(count, cells))
+
+
+def to_values(row: numpy.ndarray) -> List[Optional[int]]:
+    return [None if value == 0 else value for value in row.tolist()]
+
+
+def iter_binary(filename: str, start: int = 0, stop: Optional[int] = None) -> Iterator[List[Optional[int]]]:
+    """
+    Read the sudokus with an index between start and stop, only this part of the file is read
+    """
+    for row in load_binary(filename)[start:stop]:
+        yield to_values(row)
+
+
+def csv_to_binary(csv_filename: str, binary_filename: str) -> int:
+    return save_binary(binary_filename, iter_sudokus(csv_filename))
+
+
+def binary_to_csv(binary_filename: str, csv_filename: str) -> int:
+    return save_sudokus(csv_filename, iter_binary(binary_filename))
@@ -0,0 +1,84 @@
+import threading
+import time
+from typing import Optional
+
+TIME_LIMIT = "time_limit"
+NODE_LIMIT = "node_limit"
+CANCELLED = "cancelled"
+
+# Number of nodes between two checks of the clock and of the cancellation token
+DEFAULT_CHECK_INTERVAL = 256
+
+
+class CancellationToken:
+    """
+    Thread-safe flag used to stop a running solve from another thread
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class SolveBudget:
+    def __init__(self, time_limit: Optional[float] = None, deadline: Optional[float] = None,
+                 max_nodes: Optional[int] = None, token: Optional[CancellationToken] = None,
+                 check_interval: int = DEFAULT_CHECK_INTERVAL):
+        """
+        :param time_limit: Maximum time in seconds from the start of the solve
+        :param deadline: Time, as given by time.monotonic(), at which the solve must stop
+        :param max_nodes: Maximum number of search nodes
+        :param token: Token cancelling the solve when cancelled
+        :param check_interval: Number of nodes between two checks of the time and of the token
+        """
+        self._time_limit = time_limit
+        self._deadline = deadline
+        self._max_nodes = max_nodes
+        self._token = token
+        self._check_interval = check_interval
+        self._stop_time = None
+        self._start_time = None
+        self._next_check = 0
+
+    def start(self) -> None:
+        self._start_time = time.monotonic()
+        self._stop_time = self._deadline
+        if self._time_limit is not None:
+            stop_time = self._start_time + self._time_limit
+            self._stop_time = stop_time if self._stop_time is None else min(self._stop_time, stop_time)
+        self._next_check = 0
+
+    @property
+    def elapsed(self) -> float:
+        return 0.0 if self._start_time is None else time.monotonic() - self._start_time
+
+    def check(self, nodes: int) -> None:
+        """
+        Raise a BudgetExceededError if the budget is exceeded after this number of nodes
+        """
+        if self._max_nodes is not None and nodes > self._max_nodes:
+            raise BudgetExceededError(NODE_LIMIT)
+        if nodes < self._next_check:
+            return
+
+        self._next_check = nodes + self._check_interval
+        if self._token is not None and self._token.cancelled:
+            raise BudgetExceededError(CANCELLED)
+        if self._stop_time is not None and time.monotonic() >= self._stop_time:
+            raise BudgetExceededError(TIME_LIMIT)
+
+
+class BudgetExceededError(Exception):
+    """
+    Raised inside the solvers to unwind the search, solve() returns a BUDGET_EXCEEDED result instead
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
@@ -0,0 +1,194 @@
+import argparse
+import os
+import random
+from typing import Dict, Iterable, List, Optional
+
+from sudoku_utils.csv import parse_sudoku_line, save_sudoku_lines
+from sudoku_utils.symmetry import Transform
+from sudoku_utils.topology import PEERS, get_topology
+
+EASY = "easy"
+HARD = "hard"
+MINIMAL = "minimal"
+ADVERSARIAL = "adversarial"
+UNSOLVABLE = "unsolvable"
+
+TIERS = (EASY, HARD, MINIMAL, ADVERSARIAL, UNSOLVABLE)
+# Tiers of larger sudokus and their box sizes, not part of the default corpus
+LARGE_TIERS = {"4x4": 2, "16x16": 4, "25x25": 5}
+# Fraction of the cells given in the puzzles of the larger sudokus
+LARGE_CLUE_RATIO = 0.5
+
+EASY_SEEDS = (
+    "..4.8.3.......3.428..4.59.73.2.7.5.8.5.....7.6.8.9.2.14.62.7..952.9.......7.1.4..",
+    "5.......4.4.7869....8......1..3.8.4...6.2.3...8.1.4..7......6....2451.8.8.......3",
+    ".....6385........6...53.1.2.82.....1...7.4...4.....87.8.5.93...1........2634.....",
+    ".345.............2.2.74.1.3......6.9...374...5.1......8.2.35.1.9.............893.",
+    ".3.69..284.....57.25..4.1.6...21......3...9......68...9.8.7..45.65.....334..86.9.",
+)
+
+# AI Escargot, Arto Inkala's 2012 puzzle, Easter Monster and other puzzles requiring search
+HARD_SEEDS = (
+    "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1",
+    ".2..........6....3.74.8.........3..2.8..4..1.6..5.........1.78.5....9..........4.",
+    "12.3....435....1....4........54..2..6...7.........8.9...31..5.......9.7.....6...8",
+)
+
+# 17 clues puzzles, the minimum for a unique solution, from Gordon Royle's collection
+MINIMAL_SEEDS = (
+    ".......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6...",
+    ".......1.4.........2...........5.6.4..8...3....1.9....3..4..2...5.1........8.7...",
+    ".......12....35......6...7.7.....3.....4..8..1...........12.....8.....4..5....6..",
+    ".......12..36..........7...41..2.......5..3..7.....6..28.....4....3..5...........",
+    ".......12..8.3...........4.12.5..........47...6.......5.7...3.....62.......1.....",
+    ".......12.4..5.........9....7.6..4.....1............5.....875..6.1...3..2........",
+    ".......12.5.4............3.7..6..4....1..........8....92....8.....51.7.......3...",
+)
+
+# Puzzle built against row-major backtracking trying the values in increasing order:
+# sparse first rows whose solution is 987654321. The tier also holds puzzles made adversarial
+# for either value order, the metro solver trying the values from 9 down.
+ADVERSARIAL_SEEDS = (
+    "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+)
+
+UNSOLVABLE_ATTEMPTS = 100
+
+
+def _parse(lines: Iterable[str]) -> List[List[Optional[int]]]:
+    return [parse_sudoku_line(line) for line in lines]
+
+
+def _transformed(seeds: List[List[Optional[int]]], count: int, rng: random.Random) -> List[List[Optional[int]]]:
+    return [Transform.random(rng).apply(rng.choice(seeds)) for _ in range(count)]
+
+
+def make_adversarial(values: List[Optional[int]], rng: random.Random,
+                     descending: bool = False) -> List[Optional[int]]:
+    """
+    Reorder a puzzle so the rows with the fewest givens come first and relabel it so the
+    solution of the first row is 987654321, the worst case for a row-major backtracking
+    trying the values in increasing order
+    :param descending: Target a backtracking trying the values in decreasing order instead,
+    the solution of the first row is then 123456789
+    """
+    # Imported here so importing the corpus does not load a solver the benchmark may not run
+    from sudoku_solvers.dlx_sudoku_solver import SudokuSolver as DlxSudokuSolver
+
+    def givens(rows):
+        return sum(values[row * 9 + col] is not None for row in rows for col in range(9))
+
+    bands = sorted(range(3), key=lambda band: givens(range(band * 3, band * 3 + 3)))
+    row_order = [row for band in bands for row in sorted(range(band * 3, band * 3 + 3), key=lambda r: givens([r]))]
+    reordered = Transform(row_order, Transform.random_order(rng)).apply(values)
+
+    solution = DlxSudokuSolver(reordered).find_solutions(limit=1)[0]
+    relabel = [0] * 10
+    for col in range(9):
+        relabel[solution[col]] = col + 1 if descending else 9 - col
+    return Transform(relabel=relabel).apply(reordered)
+
+
+def make_unsolvable(values: List[Optional[int]], rng: random.Random) -> List[Optional[int]]:
+    """
+    Add a given which does not repeat any value of its row, column or box but contradicts
+    the unique solution, the puzzle looks valid and can only be rejected by searching
+    """
+    from sudoku_solvers.dlx_sudoku_solver import SudokuSolver as DlxSudokuSolver
+
+    solution = DlxSudokuSolver(values).find_solutions(limit=1)[0]
+    empty_cells = [index for index, value in enumerate(values) if value is None]
+    for _ in range(UNSOLVABLE_ATTEMPTS):
+        index = rng.choice(empty_cells)
+        peers = {values[peer] for peer in PEERS[index]}
+        choices = [value for value in range(1, 10) if value not in peers and value != solution[index]]
+        if not choices:
+            continue
+
+        unsolvable = list(values)
+        unsolvable[index] = rng.choice(choices)
+        if DlxSudokuSolver(unsolvable).count_solutions(limit=1) == 0:
+            return unsolvable
+
+    raise RuntimeError("Could not make the puzzle unsolvable")
+
+
+def make_large(box_size: int, rng: random.Random, clue_ratio: float = LARGE_CLUE_RATIO) -> List[Optional[int]]:
+    """
+    Make a solvable puzzle of any box size by shuffling the rows, columns and values of a
+    patterned solution and keeping a random fraction of its cells. The solution is not
+    necessarily unique.
+    """
+    topology = get_topology(box_size)
+    size = topology.size
+
+    def shuffled_lines():
+        return [band * box_size + offset for band in rng.sample(range(box_size), box_size)
+                for offset in rng.sample(range(box_size), box_size)]
+
+    rows = shuffled_lines()
+    cols = shuffled_lines()
+    relabel = rng.sample(range(1, size + 1), size)
+    solution = [relabel[(box_size * (row % box_size) + row // box_size + col) % size] for row in rows for col in cols]
+
+    givens = set(rng.sample(range(topology.cell_count), int(topology.cell_count * clue_ratio)))
+    return [value if index in givens else None for index, value in enumerate(solution)]
+
+
+def make_tier(tier: str, count: int, seed: int = 0) -> List[List[Optional[int]]]:
+    """
+    Make a reproducible set of puzzles of one tier from the seed puzzles and random symmetries
+    :param tier: One of TIERS or LARGE_TIERS
+    :param count: Number of puzzles
+    :param seed: Random seed, the same seed always gives the same puzzles
+    """
+    assert tier in TIERS or tier in LARGE_TIERS, "Unknown tier: {}".format(tier)
+    rng = random.Random("{}-{}".format(tier, seed))
+
+    if tier in LARGE_TIERS:
+        return [make_large(LARGE_TIERS[tier], rng) for _ in range(count)]
+
+    if tier == EASY:
+        return _transformed(_parse(EASY_SEEDS), count, rng)
+    if tier == HARD:
+        return _transformed(_parse(HARD_SEEDS), count, rng)
+    if tier == MINIMAL:
+        return _transformed(_parse(MINIMAL_SEEDS), count, rng)
+    if tier == ADVERSARIAL:
+        seeds = _parse(ADVERSARIAL_SEEDS + MINIMAL_SEEDS + HARD_SEEDS)
+        # The original adversarial puzzles first, then puzzles made adversarial for each value
+        # order in turn
+        puzzles = seeds[:min(count, len(ADVERSARIAL_SEEDS))]
+        while len(puzzles) < count:
+            puzzles.append(make_adversarial(Transform.random(rng).apply(rng.choice(seeds)), rng,
+                                            descending=len(puzzles) % 2 == 1))
+        return puzzles
+
+    seeds = _parse(HARD_SEEDS + MINIMAL_SEEDS + EASY_SEEDS)
+    return [make_unsolvable(puzzle, rng) for puzzle in _transformed(seeds, count, rng)]
+
+
+def make_corpus(tiers: Iterable[str] = TIERS, count: int = 20, seed: int = 0) -> Dict[str, List[List[Optional[int]]]]:
+    return {tier: make_tier(tier, count, seed) for tier in tiers}
+
+
+def save_corpus(directory: str, corpus: Dict[str, List[List[Optional[int]]]]) -> None:
+    """
+    Save each tier in <directory>/<tier>.txt, one puzzle per line with one character per cell
+    """
+    os.makedirs(directory, exist_ok=True)
+    for tier, puzzles in corpus.items():
+        save_sudoku_lines(os.path.join(directory, "{}.txt".format(tier)), puzzles)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate the tiered benchmark corpus")
+    parser.add_argument("directory", help="Directory to write the tiers to")
+    parser.add_argument("--tiers", default=",".join(TIERS), help="Comma separated tiers")
+    parser.add_argument("--count", type=int, default=20, help="Puzzles per tier")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    save_corpus(args.directory, make_corpus(args.tiers.split(","), args.count, args.seed))
@@ -1,6 +1,16 @@
 import csv
 import os
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
+
+from sudoku_utils.topology import box_size_of
+
+BLANK_CHARACTERS = ".0"
+# Characters of the values in the one line format, the values above 9 are letters like in base 36
+VALUE_CHARACTERS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+VALUE_OF_CHARACTER = dict(
+    [(character, value) for value, character in enumerate(VALUE_CHARACTERS, 1)] +
+    [(character.lower(), value) for value, character in enumerate(VALUE_CHARACTERS, 1)]
+)
 
 
 def save_sudoku(filename, values):
@@ -19,3 +29,60 @@ def load_sudoku(filename : str) -> List[Optional[int]]:
             values = row
             break
         return [None if value == '0' else int(value) for value in values]
+
+
+def parse_sudoku_line(line: str) -> List[Optional[int]]:
+    """
+    Parse a sudoku written on one line, either as comma separated values or as one
+    character per cell with '.' or '0' for the empty cells, 81 characters for a 9x9 sudoku,
+    256 for a 16x16 sudoku whose values above 9 are letters
+    """
+    line = line.strip()
+    if "," in line:
+        return [None if value.strip() == '0' else int(value) for value in line.split(",")]
+
+    assert box_size_of(len(line)) is not None, "Expected one character per cell, got {}".format(len(line))
+    return [None if character in BLANK_CHARACTERS else VALUE_OF_CHARACTER[character] for character in line]
+
+
+def format_sudoku_line(values: List[Optional[int]], blank: str = ".") -> str:
+    return "".join(blank if value is None else VALUE_CHARACTERS[value - 1] for value in values)
+
+
+def iter_sudokus(filename: str) -> Iterator[List[Optional[int]]]:
+    """
+    Read the sudokus of a file one at a time, one sudoku per line either as a CSV row or as
+    one character per cell. Empty lines and lines starting with '#' are skipped.
+    """
+    with open(filename, newline='') as file:
+        for line in file:
+            if not line.strip() or line.startswith("#"):
+                continue
+            yield parse_sudoku_line(line)
+
+
+def save_sudokus(filename: str, sudokus: Iterable[List[Optional[int]]]) -> int:
+    """
+    Write the sudokus one per CSV row as they are produced
+    :return: Number of sudokus written
+    """
+    count = 0
+    with open(filename, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file, delimiter=',')
+        for values in sudokus:
+            writer.writerow([0 if value is None else value for value in values])
+            count += 1
+    return count
+
+
+def save_sudoku_lines(filename: str, sudokus: Iterable[List[Optional[int]]], blank: str = ".") -> int:
+    """
+    Write the sudokus one per line, one character per cell, as they are produced
+    :return: Number of sudokus written
+    """
+    count = 0
+    with open(filename, 'w') as file:
+        for values in sudokus:
+            file.write(format_sudoku_line(values, blank) + "\n")
+            count += 1
+    return count
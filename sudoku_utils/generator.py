@@ -0,0 +1,158 @@
+import argparse
+import os
+import random
+from collections import Counter
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sudoku_solvers.dlx_sudoku_solver import SudokuSolver as DlxSudokuSolver
+from sudoku_solvers.propagation_sudoku_solver import SudokuSolver as PropagationSudokuSolver
+from sudoku_utils.csv import save_sudoku_lines
+from sudoku_utils.propagation import Propagator, ALL_RULES, NAKED_SINGLES, HIDDEN_SINGLES, NAKED_PAIRS, \
+    POINTING, BOX_LINE_REDUCTION
+from sudoku_utils.symmetry import Transform
+from sudoku_utils.topology import ALL_VALUES, BOXES
+
+EASY = "easy"
+MEDIUM = "medium"
+HARD = "hard"
+EXPERT = "expert"
+
+DIFFICULTIES = (EASY, MEDIUM, HARD, EXPERT)
+
+# Rules enough to solve the puzzles of each difficulty, the expert puzzles need search
+DIFFICULTY_RULES = (
+    (EASY, (NAKED_SINGLES, HIDDEN_SINGLES)),
+    (MEDIUM, (NAKED_SINGLES, HIDDEN_SINGLES, NAKED_PAIRS, POINTING, BOX_LINE_REDUCTION)),
+    (HARD, ALL_RULES),
+)
+
+DEFAULT_ATTEMPTS = 100
+
+
+class Rating:
+    """
+    Difficulty of a puzzle: the simplest rules solving it, or the search nodes it needs
+    """
+    __slots__ = ("difficulty", "fired", "nodes")
+
+    def __init__(self, difficulty: str, fired: Dict[str, int], nodes: int = 0):
+        """
+        :param difficulty: One of DIFFICULTIES
+        :param fired: Number of placements or eliminations made by each rule
+        :param nodes: Search nodes of the propagation solver, 0 unless the puzzle is expert
+        """
+        self.difficulty = difficulty
+        self.fired = fired
+        self.nodes = nodes
+
+    def __repr__(self):
+        return "Rating(difficulty={}, nodes={})".format(self.difficulty, self.nodes)
+
+
+def rate(values: List[Optional[int]]) -> Rating:
+    givens = [index for index, value in enumerate(values) if value is not None]
+    for difficulty, rules in DIFFICULTY_RULES:
+        propagator = Propagator(rules)
+        candidates = [ALL_VALUES if value is None else 1 << (value - 1) for value in values]
+        solved_values = list(values)
+        if propagator.propagate(candidates, solved_values, givens) and None not in solved_values:
+            return Rating(difficulty, propagator.fired)
+
+    solver = PropagationSudokuSolver(values)
+    result = solver.solve()
+    return Rating(EXPERT, solver.fired_rules, result.nodes)
+
+
+def fill_grid(rng: random.Random) -> List[int]:
+    """
+    Make a random complete grid: the diagonal boxes, independent of each other, are filled
+    at random and the rest is solved, then a random symmetry is applied
+    """
+    values = [None] * 81
+    for box in (BOXES[0], BOXES[4], BOXES[8]):
+        for index, value in zip(box, rng.sample(range(1, 10), 9)):
+            values[index] = value
+    grid = DlxSudokuSolver(values).solve().grid
+    return Transform.random(rng).apply(grid)
+
+
+def remove_clues(solution: List[int], rng: random.Random, difficulty: Optional[str] = None,
+                 symmetric: bool = False) -> List[Optional[int]]:
+    """
+    Remove the clues of a complete grid in random order, keeping a removal only if the
+    puzzle still has a unique solution and is not harder than the difficulty
+    :param difficulty: Hardest difficulty allowed, any by default
+    :param symmetric: Remove the clues by pairs symmetric around the center
+    """
+    max_level = DIFFICULTIES.index(difficulty) if difficulty is not None else len(DIFFICULTIES) - 1
+    values = list(solution)
+    cells = list(range(41 if symmetric else 81))
+    rng.shuffle(cells)
+    for index in cells:
+        removed = {index, 80 - index} if symmetric else {index}
+        puzzle = [None if cell in removed else value for cell, value in enumerate(values)]
+        if not DlxSudokuSolver(puzzle).is_unique():
+            continue
+        if max_level < len(DIFFICULTIES) - 1 and DIFFICULTIES.index(rate(puzzle).difficulty) > max_level:
+            continue
+        values = puzzle
+
+    return values
+
+
+def generate(rng: random.Random, difficulty: Optional[str] = None, symmetric: bool = False,
+             attempts: int = DEFAULT_ATTEMPTS) -> Tuple[List[Optional[int]], Rating]:
+    """
+    Generate a puzzle with a unique solution
+    :param difficulty: Difficulty of the puzzle, any by default
+    :param symmetric: Keep the clues symmetric around the center
+    :param attempts: Number of grids tried before giving up on the difficulty
+    :return: Puzzle and its rating
+    """
+    assert difficulty is None or difficulty in DIFFICULTIES, "Unknown difficulty: {}".format(difficulty)
+
+    for _ in range(attempts):
+        puzzle = remove_clues(fill_grid(rng), rng, difficulty, symmetric)
+        rating = rate(puzzle)
+        if difficulty is None or rating.difficulty == difficulty:
+            return puzzle, rating
+
+    raise RuntimeError("Could not generate a {} puzzle in {} attempts".format(difficulty, attempts))
+
+
+def _generate_task(task):
+    index, seed, difficulty, symmetric = task
+    return generate(random.Random("{}-{}".format(seed, index)), difficulty, symmetric)
+
+
+def generate_many(count: int, difficulty: Optional[str] = None, seed: int = 0, symmetric: bool = False,
+                  workers: Optional[int] = None) -> Iterator[Tuple[List[Optional[int]], Rating]]:
+    """
+    Generate puzzles on a pool of processes, the puzzles only depend on the seed and are yielded in order
+    :param workers: Number of processes, defaults to the number of CPUs
+    """
+    tasks = ((index, seed, difficulty, symmetric) for index in range(count))
+    with Pool(workers or os.cpu_count()) as pool:
+        yield from pool.imap(_generate_task, tasks)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate puzzles with a unique solution")
+    parser.add_argument("filename", help="File to write the puzzles to, one per line")
+    parser.add_argument("--count", type=int, default=100, help="Number of puzzles")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES, help="Difficulty of the puzzles, any by default")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--symmetric", action="store_true", help="Keep the clues symmetric around the center")
+    parser.add_argument("--workers", type=int, help="Number of processes, defaults to the number of CPUs")
+    args = parser.parse_args()
+
+    difficulties = Counter()
+
+    def puzzles():
+        for puzzle, rating in generate_many(args.count, args.difficulty, args.seed, args.symmetric, args.workers):
+            difficulties[rating.difficulty] += 1
+            yield puzzle
+
+    save_sudoku_lines(args.filename, puzzles())
+    print("Generated {} puzzles: {}".format(args.count, dict(difficulties)))
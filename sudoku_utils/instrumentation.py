@@ -0,0 +1,86 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+SETUP = "setup"
+PROPAGATION = "propagation"
+SEARCH = "search"
+
+# on_guess(depth, cell index, value) and on_backtrack(depth, cell index)
+GuessHook = Callable[[int, int, int], None]
+BacktrackHook = Callable[[int, int], None]
+
+
+class SearchStats:
+    """
+    Opt-in search profile of a solver, given to the solver constructor.
+    The solvers only check whether they were given one, so it costs nothing when not used.
+    """
+
+    def __init__(self, on_guess: Optional[GuessHook] = None, on_backtrack: Optional[BacktrackHook] = None):
+        self._on_guess = on_guess
+        self._on_backtrack = on_backtrack
+        self._nodes = 0
+        self._backtracks = 0
+        self._max_depth = 0
+        self._propagation_calls = 0
+        self._phase_times = {}
+
+    @property
+    def nodes(self) -> int:
+        return self._nodes
+
+    @property
+    def backtracks(self) -> int:
+        return self._backtracks
+
+    @property
+    def max_depth(self) -> int:
+        return self._max_depth
+
+    @property
+    def propagation_calls(self) -> int:
+        return self._propagation_calls
+
+    @property
+    def phase_times(self) -> Dict[str, float]:
+        """
+        Time spent in each phase in seconds, the search time includes the propagation done after the guesses
+        """
+        return dict(self._phase_times)
+
+    def guess(self, depth: int, index: int, value: int) -> None:
+        self._nodes += 1
+        if depth > self._max_depth:
+            self._max_depth = depth
+        if self._on_guess is not None:
+            self._on_guess(depth, index, value)
+
+    def backtrack(self, depth: int, index: int) -> None:
+        self._backtracks += 1
+        if self._on_backtrack is not None:
+            self._on_backtrack(depth, index)
+
+    def propagation(self, duration: float) -> None:
+        self._propagation_calls += 1
+        self.add_time(PROPAGATION, duration)
+
+    def add_time(self, phase: str, duration: float) -> None:
+        self._phase_times[phase] = self._phase_times.get(phase, 0.0) + duration
+
+    @contextmanager
+    def phase(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def to_dict(self) -> Dict:
+        return {
+            "nodes": self._nodes,
+            "backtracks": self._backtracks,
+            "max_depth": self._max_depth,
+            "propagation_calls": self._propagation_calls,
+            "phase_times": self.phase_times,
+        }
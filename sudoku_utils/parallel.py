@@ -0,0 +1,95 @@
+import os
+import signal
+import threading
+from multiprocessing import Pool
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sudoku_solvers.registry import get_solver
+from sudoku_utils.budget import TIME_LIMIT
+from sudoku_utils.result import SolveResult, BUDGET_EXCEEDED
+
+DEFAULT_SOLVER = "propagation"
+DEFAULT_CHUNK_SIZE = 64
+# Number of chunks queued per worker, bounds the memory used for an unbounded input
+QUEUED_CHUNKS_PER_WORKER = 8
+
+_solver_class = None
+_solver_options = None
+_timeout = None
+
+
+class SolveTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise SolveTimeout("The sudoku could not be solved in {}s".format(_timeout))
+
+
+def _init_worker(solver: str, solver_options: dict, timeout: Optional[float]):
+    global _solver_class, _solver_options, _timeout
+    _solver_class = get_solver(solver).load()
+    _solver_options = solver_options
+    _timeout = timeout
+    if timeout is not None:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+
+def _solve(task):
+    index, values = task
+    try:
+        try:
+            if _timeout is not None:
+                signal.setitimer(signal.ITIMER_REAL, _timeout)
+            result = _solver_class(values, **_solver_options).solve()
+        finally:
+            if _timeout is not None:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except SolveTimeout:
+        result = SolveResult(BUDGET_EXCEEDED, elapsed=_timeout, reason=TIME_LIMIT)
+    return index, result
+
+
+def solve_many(puzzles: Iterable[List[Optional[int]]], solver: str = DEFAULT_SOLVER,
+               workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE, ordered: bool = True,
+               timeout: Optional[float] = None, **solver_options) -> Iterator[Tuple[int, SolveResult]]:
+    """
+    Solve the puzzles on a pool of processes, each worker loads the solver and constructs
+    the solvers itself
+    :param puzzles: Puzzles as 81 values, can be a generator, it is consumed as the work progresses
+    :param solver: Name of the solver in the registry
+    :param workers: Number of processes, defaults to the number of CPUs
+    :param chunk_size: Number of puzzles sent to a worker at once
+    :param ordered: Yield the results in input order, otherwise as they complete
+    :param timeout: Maximum time in seconds spent on one puzzle
+    :param solver_options: Keyword arguments given to the SudokuSolver constructor
+    :return: Pairs of puzzle index and SolveResult, a BUDGET_EXCEEDED result if the timeout expired
+    """
+    workers = workers or os.cpu_count()
+    # Fail on an unknown solver here rather than in every worker
+    get_solver(solver)
+    # A puzzle takes a slot when it is read and frees it when its result is yielded, so the workers
+    # never wait for each other while the puzzles read ahead stay bounded
+    slots = threading.BoundedSemaphore(workers * QUEUED_CHUNKS_PER_WORKER * chunk_size)
+    stopped = False
+
+    def tasks():
+        for task in enumerate(puzzles):
+            slots.acquire()
+            if stopped:
+                return
+            yield task
+
+    with Pool(workers, _init_worker, (solver, solver_options, timeout)) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        try:
+            for result in imap(_solve, tasks(), chunk_size):
+                slots.release()
+                yield result
+        finally:
+            # Unblock the reading of the puzzles so the pool can be terminated
+            stopped = True
+            try:
+                slots.release()
+            except ValueError:
+                pass
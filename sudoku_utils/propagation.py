@@ -0,0 +1,233 @@
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional
+
+from sudoku_utils.topology import get_topology
+
+NAKED_SINGLES = "naked_singles"
+HIDDEN_SINGLES = "hidden_singles"
+NAKED_PAIRS = "naked_pairs"
+NAKED_TRIPLES = "naked_triples"
+POINTING = "pointing"
+BOX_LINE_REDUCTION = "box_line_reduction"
+
+ALL_RULES = (NAKED_SINGLES, HIDDEN_SINGLES, NAKED_PAIRS, NAKED_TRIPLES, POINTING, BOX_LINE_REDUCTION)
+
+
+class Contradiction(Exception):
+    pass
+
+
+class Propagator:
+    """
+    Applies the enabled deduction rules to a fixpoint on a grid of candidate masks.
+
+    The values of assigned cells are always removed from their peers, this is the sudoku
+    constraint itself. The rules only control which further deductions are made.
+    """
+
+    def __init__(self, rules: Iterable[str] = ALL_RULES, box_size: int = 3):
+        """
+        :param rules: Deduction rules to apply
+        :param box_size: Box size of the sudokus, 3 for 9x9 sudokus
+        """
+        rules = set(rules)
+        unknown_rules = rules.difference(ALL_RULES)
+        assert not unknown_rules, "Unknown propagation rules: {}".format(", ".join(sorted(unknown_rules)))
+
+        self._topology = get_topology(box_size)
+        self._naked_singles = NAKED_SINGLES in rules
+        # Cheapest rules first, the loop restarts from the first rule after any change
+        self._unit_rules = []
+        if HIDDEN_SINGLES in rules:
+            self._unit_rules.append(self._apply_hidden_singles)
+        if NAKED_PAIRS in rules:
+            self._unit_rules.append(self._apply_naked_pairs)
+        if POINTING in rules:
+            self._unit_rules.append(self._apply_pointing)
+        if BOX_LINE_REDUCTION in rules:
+            self._unit_rules.append(self._apply_box_line_reduction)
+        if NAKED_TRIPLES in rules:
+            self._unit_rules.append(self._apply_naked_triples)
+
+        self._fired = {rule: 0 for rule in ALL_RULES}
+        self._calls = 0
+
+    @property
+    def fired(self) -> Dict[str, int]:
+        """
+        Number of times each rule made a placement or an elimination
+        """
+        return dict(self._fired)
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def propagate(self, candidates: List[int], values: List[Optional[int]], assigned: List[int]) -> bool:
+        """
+        Propagate the newly assigned cells and apply the rules until nothing changes
+        :param candidates: Candidate mask of every cell, modified in place
+        :param values: Value of every cell, None when not assigned, modified in place
+        :param assigned: Indices of the cells assigned since the last propagation
+        :return: False if a contradiction was found
+        """
+        self._calls += 1
+        queue = list(assigned)
+        try:
+            while True:
+                self._propagate_assignments(candidates, values, queue)
+                for apply_rule in self._unit_rules:
+                    if apply_rule(candidates, values, queue):
+                        break
+                else:
+                    return True
+        except Contradiction:
+            return False
+
+    def _propagate_assignments(self, candidates, values, queue):
+        peers = self._topology.peers
+        while queue:
+            index = queue.pop()
+            bit = candidates[index]
+            for peer in peers[index]:
+                if candidates[peer] & bit:
+                    self._remove(candidates, values, queue, peer, bit, NAKED_SINGLES)
+
+    def _remove(self, candidates, values, queue, index, bits, rule):
+        """
+        Remove the candidate bits from a cell, assigning it if a single candidate remains
+        """
+        remaining = candidates[index] & ~bits
+        if remaining == 0:
+            raise Contradiction()
+
+        candidates[index] = remaining
+        if rule != NAKED_SINGLES:
+            self._fired[rule] += 1
+        if values[index] is None and self._naked_singles and not remaining & (remaining - 1):
+            self._assign(values, queue, index, remaining, NAKED_SINGLES)
+
+    def _assign(self, values, queue, index, bit, rule):
+        values[index] = bit.bit_length()
+        queue.append(index)
+        self._fired[rule] += 1
+
+    def _apply_hidden_singles(self, candidates, values, queue):
+        changed = False
+        for unit in self._topology.units:
+            seen_once = 0
+            seen_more = 0
+            for index in unit:
+                mask = candidates[index]
+                seen_more |= seen_once & mask
+                seen_once |= mask
+
+            if seen_once != self._topology.all_values:
+                raise Contradiction()
+
+            hidden = seen_once & ~seen_more
+            if not hidden:
+                continue
+
+            for index in unit:
+                bit = candidates[index] & hidden
+                if bit and values[index] is None:
+                    if bit & (bit - 1):
+                        # Two values can only go in the same cell
+                        raise Contradiction()
+                    candidates[index] = bit
+                    self._assign(values, queue, index, bit, HIDDEN_SINGLES)
+                    changed = True
+
+        return changed
+
+    def _apply_naked_pairs(self, candidates, values, queue):
+        bit_count = self._topology.bit_count
+        changed = False
+        for unit in self._topology.units:
+            pairs = {}
+            for index in unit:
+                mask = candidates[index]
+                if values[index] is None and bit_count(mask) == 2:
+                    pairs.setdefault(mask, []).append(index)
+
+            for mask, cells in pairs.items():
+                if len(cells) < 2:
+                    continue
+                if len(cells) > 2:
+                    raise Contradiction()
+                for index in unit:
+                    if index not in cells and candidates[index] & mask:
+                        self._remove(candidates, values, queue, index, mask, NAKED_PAIRS)
+                        changed = True
+
+        return changed
+
+    def _apply_naked_triples(self, candidates, values, queue):
+        bit_count = self._topology.bit_count
+        changed = False
+        for unit in self._topology.units:
+            cells = [index for index in unit if values[index] is None and bit_count(candidates[index]) <= 3]
+            for triple in combinations(cells, 3):
+                mask = candidates[triple[0]] | candidates[triple[1]] | candidates[triple[2]]
+                if bit_count(mask) != 3:
+                    continue
+                for index in unit:
+                    if index not in triple and candidates[index] & mask:
+                        self._remove(candidates, values, queue, index, mask, NAKED_TRIPLES)
+                        changed = True
+
+        return changed
+
+    def _apply_pointing(self, candidates, values, queue):
+        """
+        A value confined to one row or column of a box is removed from the rest of the line
+        """
+        topology = self._topology
+        box_of = topology.box_of
+        changed = False
+        for box in topology.boxes:
+            for bit in topology.bits_of(self._unassigned_values(candidates, values, box)):
+                cells = [index for index in box if candidates[index] & bit]
+                for line_of, lines in ((topology.row_of, topology.rows), (topology.col_of, topology.cols)):
+                    line = line_of[cells[0]]
+                    if any(line_of[index] != line for index in cells):
+                        continue
+                    for index in lines[line]:
+                        if box_of[index] != box_of[cells[0]] and candidates[index] & bit:
+                            self._remove(candidates, values, queue, index, bit, POINTING)
+                            changed = True
+
+        return changed
+
+    def _apply_box_line_reduction(self, candidates, values, queue):
+        """
+        A value confined to one box within a row or column is removed from the rest of the box
+        """
+        topology = self._topology
+        box_of = topology.box_of
+        changed = False
+        for line_of, lines in ((topology.row_of, topology.rows), (topology.col_of, topology.cols)):
+            for line in lines:
+                for bit in topology.bits_of(self._unassigned_values(candidates, values, line)):
+                    cells = [index for index in line if candidates[index] & bit]
+                    box = box_of[cells[0]]
+                    if any(box_of[index] != box for index in cells):
+                        continue
+                    for index in topology.boxes[box]:
+                        if line_of[index] != line_of[cells[0]] and candidates[index] & bit:
+                            self._remove(candidates, values, queue, index, bit, BOX_LINE_REDUCTION)
+                            changed = True
+
+        return changed
+
+    @staticmethod
+    def _unassigned_values(candidates, values, unit):
+        assigned = 0
+        possible = 0
+        for index in unit:
+            if values[index] is None:
+                possible |= candidates[index]
+            else:
+                assigned |= candidates[index]
+        return possible & ~assigned
@@ -0,0 +1,59 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+INVALID_INPUT = "invalid_input"
+BUDGET_EXCEEDED = "budget_exceeded"
+
+STATUSES = (SOLVED, UNSOLVABLE, INVALID_INPUT, BUDGET_EXCEEDED)
+
+
+class SolveResult:
+    """
+    Outcome of a solve: the status, the solved grid if any and the statistics of the search
+    """
+    __slots__ = ("status", "grid", "solution_count", "elapsed", "nodes", "reason", "stats")
+
+    def __init__(self, status: str, grid: Optional[List[int]] = None, solution_count: Optional[int] = None,
+                 elapsed: float = 0.0, nodes: Optional[int] = None, reason: Optional[str] = None, stats=None):
+        """
+        :param status: One of STATUSES
+        :param grid: Solution, the first one found when counting
+        :param solution_count: Number of solutions, only set when they were counted
+        :param elapsed: Solve time in seconds
+        :param nodes: Number of search nodes, None for the solvers not counting them
+        :param reason: Issue rejecting the input, see sudoku_utils.validation, or budget limit exceeded
+        :param stats: SearchStats given to the solver, if any
+        """
+        self.status = status
+        self.grid = grid
+        self.solution_count = solution_count
+        self.elapsed = elapsed
+        self.nodes = nodes
+        self.reason = reason
+        self.stats = stats
+
+    @property
+    def solved(self) -> bool:
+        return self.status == SOLVED
+
+    def __repr__(self):
+        return "SolveResult(status={}, solution_count={}, elapsed={:.6f}s, nodes={}, reason={})".format(
+            self.status, self.solution_count, self.elapsed, self.nodes, self.reason)
+
+    def to_dict(self) -> Dict:
+        return {
+            "status": self.status,
+            "grid": self.grid,
+            "solution_count": self.solution_count,
+            "elapsed": self.elapsed,
+            "nodes": self.nodes,
+            "reason": self.reason,
+            "stats": None if self.stats is None else self.stats.to_dict(),
+        }
+
+
+def count_statuses(results: Iterable[SolveResult]) -> Dict[str, int]:
+    counts = Counter(result.status for result in results)
+    return {status: counts[status] for status in STATUSES}
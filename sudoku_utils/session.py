@@ -0,0 +1,180 @@
+from typing import List, Optional, Tuple
+
+from sudoku_solvers.propagation_sudoku_solver import SudokuSolver as PropagationSudokuSolver
+from sudoku_utils.result import SolveResult
+from sudoku_utils.topology import box_size_of, get_topology
+
+
+class SolverSession:
+    """
+    Sudoku being edited, keeping the values of each row, column and box up to date so the
+    candidates of a cell and the hints do not need a new solver for every change.
+
+    Values repeating a value of their row, column or box can be placed, like while typing a
+    grid, the session is then not valid until they are cleared. The last solution found is
+    kept while the placed values agree with it.
+    """
+
+    def __init__(self, values: List[Optional[int]], box_size: Optional[int] = None):
+        """
+        :param values: Initial values, None for the empty cells
+        :param box_size: Box size of the sudoku, by default given by the number of values
+        """
+        box_size = box_size or box_size_of(len(values))
+        assert box_size is not None and len(values) == box_size ** 4, \
+            "Expected the values of a square sudoku, got {} values".format(len(values))
+
+        topology = get_topology(box_size)
+        size = topology.size
+        self._topology = topology
+        self._values = [None] * topology.cell_count
+        # Units numbered rows first, then columns then boxes
+        self._units_of = tuple(
+            (topology.row_of[index], size + topology.col_of[index], 2 * size + topology.box_of[index])
+            for index in range(topology.cell_count)
+        )
+        # Number of cells of each unit holding each value, and mask of the values present in each unit
+        self._counts = [[0] * (size + 1) for _ in range(3 * size)]
+        self._masks = [0] * (3 * size)
+        # Number of values repeated in a unit, counting each extra occurrence
+        self._repeats = 0
+        self._history = []
+        self._solution = None
+
+        for index, value in enumerate(values):
+            if value is not None:
+                self._check_value(value)
+                self._set(index, value)
+
+    @property
+    def values(self) -> List[Optional[int]]:
+        return self._values[:]
+
+    @property
+    def valid(self) -> bool:
+        """
+        Whether no value is repeated in a row, a column or a box
+        """
+        return self._repeats == 0
+
+    @property
+    def complete(self) -> bool:
+        return self._repeats == 0 and None not in self._values
+
+    def candidates(self, cell: int) -> List[int]:
+        """
+        Values which can be placed in an empty cell without repeating a value of its row,
+        column or box, no value for a filled cell
+        """
+        if self._values[cell] is not None:
+            return []
+        return [bit.bit_length() for bit in self._topology.bits_of(self._free(cell))]
+
+    def place(self, cell: int, value: int) -> bool:
+        """
+        :return: Whether the value does not repeat a value of the row, column or box of the cell
+        """
+        self._check_value(value)
+        previous = self._values[cell]
+        if previous == value:
+            return True
+
+        self._history.append((cell, previous))
+        if previous is not None:
+            self._unset(cell, previous)
+        return self._set(cell, value)
+
+    def clear(self, cell: int) -> None:
+        previous = self._values[cell]
+        if previous is None:
+            return
+
+        self._history.append((cell, previous))
+        self._unset(cell, previous)
+
+    def undo(self) -> bool:
+        """
+        Revert the last place or clear
+        :return: False if there was nothing to undo
+        """
+        if not self._history:
+            return False
+
+        cell, previous = self._history.pop()
+        current = self._values[cell]
+        if current is not None:
+            self._unset(cell, current)
+        if previous is not None:
+            self._set(cell, previous)
+        return True
+
+    def hint(self) -> Optional[Tuple[int, int]]:
+        """
+        Next value to place: an empty cell with a single candidate if there is one, otherwise
+        the empty cell with the fewest candidates, its value taken from the solution
+        :return: Cell and value, None if the sudoku is complete or cannot be solved
+        """
+        if self._repeats:
+            return None
+
+        bit_count = self._topology.bit_count
+        best_cell = None
+        best_count = self._topology.size + 1
+        for cell, value in enumerate(self._values):
+            if value is not None:
+                continue
+            count = bit_count(self._free(cell))
+            if count == 0:
+                return None
+            if count < best_count:
+                best_cell, best_count = cell, count
+
+        if best_cell is None:
+            return None
+        # A single candidate is only a hint if the other cells can still be filled
+        if self._solution is None and not self.solve().solved:
+            return None
+        return best_cell, self._solution[best_cell]
+
+    def solve(self) -> SolveResult:
+        """
+        Solve the current values, the placed values are left unchanged
+        """
+        result = PropagationSudokuSolver(self._values).solve()
+        self._solution = result.grid if result.solved else None
+        return result
+
+    def _check_value(self, value):
+        assert 0 < value <= self._topology.size, "The values go from 1 to {}".format(self._topology.size)
+
+    def _free(self, cell):
+        row, col, box = self._units_of[cell]
+        return self._topology.all_values & ~(self._masks[row] | self._masks[col] | self._masks[box])
+
+    def _set(self, cell, value):
+        self._values[cell] = value
+        if self._solution is not None and self._solution[cell] != value:
+            self._solution = None
+
+        bit = 1 << (value - 1)
+        repeated = False
+        for unit in self._units_of[cell]:
+            counts = self._counts[unit]
+            if counts[value]:
+                repeated = True
+                self._repeats += 1
+            counts[value] += 1
+            self._masks[unit] |= bit
+        return not repeated
+
+    def _unset(self, cell, value):
+        # A solution stays a solution when a value is removed
+        self._values[cell] = None
+        bit = 1 << (value - 1)
+        for unit in self._units_of[cell]:
+            counts = self._counts[unit]
+            counts[value] -= 1
+            if counts[value]:
+                self._repeats -= 1
+            else:
+                self._masks[unit] &= ~bit
@@ -0,0 +1,189 @@
+from itertools import groupby, permutations, product
+from random import Random
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy
+
+
+class Transform:
+    """
+    Validity preserving transformation of a sudoku: optional transposition, then row and
+    column reordering, then digit relabeling.
+
+    Cell (row, col) of the result is relabel[cell (row_order[row], col_order[col])] of the
+    (transposed) source. The orders only move rows within their band and bands as a whole,
+    and the same for columns within stacks.
+    """
+
+    def __init__(self, row_order: Sequence[int] = tuple(range(9)), col_order: Sequence[int] = tuple(range(9)),
+                 transposed: bool = False, relabel: Sequence[int] = tuple(range(10))):
+        assert sorted(row_order) == list(range(9)) and sorted(col_order) == list(range(9))
+        assert relabel[0] == 0 and sorted(relabel) == list(range(10))
+
+        self._row_order = tuple(row_order)
+        self._col_order = tuple(col_order)
+        self._transposed = transposed
+        self._relabel = tuple(relabel)
+
+    @property
+    def row_order(self):
+        return self._row_order
+
+    @property
+    def col_order(self):
+        return self._col_order
+
+    @property
+    def transposed(self):
+        return self._transposed
+
+    @property
+    def relabel(self):
+        return self._relabel
+
+    def apply(self, values: List[Optional[int]]) -> List[Optional[int]]:
+        if self._transposed:
+            values = [values[col * 9 + row] for row in range(9) for col in range(9)]
+
+        relabel = self._relabel
+        result = []
+        for row in self._row_order:
+            for col in self._col_order:
+                value = values[row * 9 + col]
+                result.append(None if value is None else relabel[value])
+        return result
+
+    @staticmethod
+    def random(rng: Random) -> "Transform":
+        return Transform(Transform.random_order(rng), Transform.random_order(rng),
+                         rng.random() < 0.5, [0] + rng.sample(range(1, 10), 9))
+
+    @staticmethod
+    def random_order(rng: Random) -> List[int]:
+        """
+        Random order of rows, or columns, keeping them grouped by band
+        """
+        bands = rng.sample(range(3), 3)
+        return [band * 3 + offset for band in bands for offset in rng.sample(range(3), 3)]
+
+    def inverse(self) -> "Transform":
+        row_order = _inverse_order(self._row_order)
+        col_order = _inverse_order(self._col_order)
+        relabel = _inverse_order(self._relabel)
+        if self._transposed:
+            # Reordering then transposing is transposing then reordering with rows and columns swapped
+            return Transform(col_order, row_order, True, relabel)
+        return Transform(row_order, col_order, False, relabel)
+
+
+def _inverse_order(order: Sequence[int]) -> List[int]:
+    inverse = [0] * len(order)
+    for position, item in enumerate(order):
+        inverse[item] = position
+    return inverse
+
+
+def _line_orders() -> List[List[int]]:
+    """
+    All the orders of rows, or columns, keeping them grouped by band
+    """
+    return [[band * 3 + offset for band, offsets in zip(bands, band_offsets) for offset in offsets]
+            for bands in permutations(range(3)) for band_offsets in product(permutations(range(3)), repeat=3)]
+
+
+LINE_ORDERS = numpy.array(_line_orders(), dtype=numpy.intp)
+# The first column of a row is its most significant bit
+COLUMN_WEIGHTS = numpy.array([1 << (8 - col) for col in range(9)], dtype=numpy.int64)
+MAX_CANDIDATES = 4096
+
+
+def _tied_orders(items: List[int], key) -> Iterator[List[int]]:
+    """
+    All the orders of the items sorted by key, items with the same key being in any order
+    """
+    groups = [list(group) for _, group in groupby(sorted(items, key=key), key=key)]
+    for choice in product(*(permutations(group) for group in groups)):
+        yield [item for group in choice for item in group]
+
+
+def _minimal_row_orders(row_values: List[int]) -> Iterator[List[int]]:
+    """
+    All the row orders giving the lexicographically smallest sequence of row values
+    """
+    bands = [sorted(range(band * 3, band * 3 + 3), key=row_values.__getitem__) for band in range(3)]
+    band_keys = [tuple(row_values[row] for row in rows) for rows in bands]
+    for band_order in _tied_orders(list(range(3)), band_keys.__getitem__):
+        for rows in product(*(_tied_orders(bands[band], row_values.__getitem__) for band in band_order)):
+            yield [row for band_rows in rows for row in band_rows]
+
+
+def _relabel_by_appearance(digits: Sequence[int]) -> List[int]:
+    """
+    Relabeling numbering the digits in order of first appearance, 0 staying 0
+    """
+    relabel = [0] * 10
+    label = 1
+    for digit in digits:
+        if digit and not relabel[digit]:
+            relabel[digit] = label
+            label += 1
+    for digit in range(1, 10):
+        if not relabel[digit]:
+            relabel[digit] = label
+            label += 1
+    return relabel
+
+
+def canonicalize(values: List[Optional[int]]) -> Tuple[List[Optional[int]], Transform]:
+    """
+    Find a canonical form of a sudoku under digit relabeling, row and column reordering within
+    bands and stacks, band and stack reordering and transposition. Equivalent sudokus have the
+    same canonical form.
+
+    The pattern of givens is minimized first over all transpositions and column orders, each
+    column order giving its best row order directly. The digits then decide between the orders
+    giving the same pattern. For highly symmetric patterns only the first MAX_CANDIDATES orders
+    are compared, such sudokus can then have more than one canonical form.
+    :return: Canonical sudoku and the transform from the sudoku to it
+    """
+    grid = numpy.array([0 if value is None else value for value in values], dtype=numpy.int64).reshape(9, 9)
+
+    best_pattern = None
+    best_orders = []
+    for transposed in (False, True):
+        source = grid.T if transposed else grid
+        # Given pattern of each row, under every column order: (column orders, rows)
+        row_values = ((source != 0)[:, LINE_ORDERS] * COLUMN_WEIGHTS).sum(axis=2).T
+        bands = numpy.sort(row_values.reshape(len(LINE_ORDERS), 3, 3), axis=2)
+        band_keys = numpy.sort((bands[..., 0] << 18) | (bands[..., 1] << 9) | bands[..., 2], axis=1)
+
+        best = numpy.lexsort(band_keys.T[::-1])[0]
+        pattern = tuple(band_keys[best].tolist())
+        if best_pattern is not None and pattern > best_pattern:
+            continue
+        if best_pattern is None or pattern < best_pattern:
+            best_pattern = pattern
+            best_orders = []
+        for col_index in numpy.flatnonzero((band_keys == band_keys[best]).all(axis=1)):
+            best_orders.append((transposed, LINE_ORDERS[col_index].tolist(), row_values[col_index].tolist()))
+
+    best_digits = None
+    best_transform = None
+    candidates = 0
+    for transposed, col_order, row_values in best_orders:
+        source = (grid.T if transposed else grid).tolist()
+        for row_order in _minimal_row_orders(row_values):
+            digits = [source[row][col] for row in row_order for col in col_order]
+            relabel = _relabel_by_appearance(digits)
+            relabeled = [relabel[digit] for digit in digits]
+            if best_digits is None or relabeled < best_digits:
+                best_digits = relabeled
+                best_transform = Transform(row_order, col_order, transposed, relabel)
+
+            candidates += 1
+            if candidates >= MAX_CANDIDATES:
+                break
+        if candidates >= MAX_CANDIDATES:
+            break
+
+    return best_transform.apply(values), best_transform
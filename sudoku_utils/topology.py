@@ -0,0 +1,115 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+# Largest grid size whose candidate masks are all tabulated, the larger ones are computed
+MAX_TABLE_SIZE = 9
+
+
+def _bits_of(mask: int) -> List[int]:
+    bits = []
+    while mask:
+        bit = mask & -mask
+        bits.append(bit)
+        mask ^= bit
+    return bits
+
+
+def _bit_count(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+# Tables of every mask of up to MAX_TABLE_SIZE values
+BIT_COUNT = tuple(_bit_count(mask) for mask in range(1 << MAX_TABLE_SIZE))
+BITS_OF = tuple(tuple(_bits_of(mask)) for mask in range(1 << MAX_TABLE_SIZE))
+
+
+class Topology:
+    """
+    Cells, units and candidate masks of a sudoku made of size x size boxes of box_size x box_size
+    cells, size being box_size ** 2 and the values going from 1 to size.
+
+    Bit n - 1 of a candidate mask is set when the value n is possible. bit_count(mask) and
+    bits_of(mask) are table lookups up to MAX_TABLE_SIZE values.
+    """
+
+    def __init__(self, box_size: int):
+        assert box_size >= 2, "The boxes must be at least 2x2"
+
+        size = box_size * box_size
+        cell_count = size * size
+        self.box_size = box_size
+        self.size = size
+        self.cell_count = cell_count
+        self.all_values = (1 << size) - 1
+
+        if size <= MAX_TABLE_SIZE:
+            self.bit_count = BIT_COUNT.__getitem__
+            self.bits_of = BITS_OF.__getitem__
+        else:
+            self.bit_count = _bit_count
+            self.bits_of = _bits_of
+
+        self.row_of = tuple(index // size for index in range(cell_count))
+        self.col_of = tuple(index % size for index in range(cell_count))
+        self.box_of = tuple((index // (size * box_size)) * box_size + (index % size) // box_size
+                            for index in range(cell_count))
+
+        self.rows = tuple(tuple(index for index in range(cell_count) if self.row_of[index] == row)
+                          for row in range(size))
+        self.cols = tuple(tuple(index for index in range(cell_count) if self.col_of[index] == col)
+                          for col in range(size))
+        self.boxes = tuple(tuple(index for index in range(cell_count) if self.box_of[index] == box)
+                           for box in range(size))
+        self.units = self.rows + self.cols + self.boxes
+
+        self.peers = tuple(
+            tuple(sorted(set(self.rows[self.row_of[index]] + self.cols[self.col_of[index]] +
+                             self.boxes[self.box_of[index]]) - {index}))
+            for index in range(cell_count)
+        )
+
+    def format_grid(self, values: Sequence[Optional[int]]) -> str:
+        """
+        Grid drawn with the boxes separated, the empty cells are blank
+        """
+        width = len(str(self.size))
+        band_line = "=" * ((width + 3) * self.size + 2 * self.box_size + 1)
+        lines = [band_line]
+        for row in range(self.size):
+            cells = [" " * width if value is None else str(value).rjust(width)
+                     for value in values[row * self.size:(row + 1) * self.size]]
+            boxes = [" | ".join(cells[box:box + self.box_size]) for box in range(0, self.size, self.box_size)]
+            lines.append("|| " + " || ".join(boxes) + " ||")
+            lines.append(band_line if (row + 1) % self.box_size == 0 else "-" * len(band_line))
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def get_topology(box_size: int) -> Topology:
+    return Topology(box_size)
+
+
+def box_size_of(cell_count: int) -> Optional[int]:
+    """
+    :return: Box size of a sudoku with this number of cells, None if no sudoku has that many cells
+    """
+    box_size = 2
+    while box_size ** 4 < cell_count:
+        box_size += 1
+    return box_size if box_size ** 4 == cell_count else None
+
+
+STANDARD = get_topology(3)
+
+ALL_VALUES = STANDARD.all_values
+
+ROW_OF = STANDARD.row_of
+COL_OF = STANDARD.col_of
+BOX_OF = STANDARD.box_of
+
+ROWS = STANDARD.rows
+COLS = STANDARD.cols
+BOXES = STANDARD.boxes
+UNITS = STANDARD.units
+
+PEERS = STANDARD.peers
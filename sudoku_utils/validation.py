@@ -0,0 +1,110 @@
+from numbers import Integral
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from sudoku_utils.result import INVALID_INPUT, UNSOLVABLE
+from sudoku_utils.topology import box_size_of, get_topology
+
+# Invalid inputs
+WRONG_SIZE = "wrong_size"
+VALUE_OUT_OF_RANGE = "value_out_of_range"
+DUPLICATE_VALUE = "duplicate_value"
+# Valid inputs contradicting themselves
+NO_CANDIDATES = "no_candidates"
+NO_PLACE_FOR_VALUE = "no_place_for_value"
+
+INVALID_REASONS = (WRONG_SIZE, VALUE_OUT_OF_RANGE, DUPLICATE_VALUE)
+
+
+class Issue:
+    """
+    Problem found in a sudoku before solving it, with the cells causing it
+    """
+    __slots__ = ("reason", "cells")
+
+    def __init__(self, reason: str, cells: Tuple[int, ...] = ()):
+        self.reason = reason
+        self.cells = cells
+
+    @property
+    def status(self) -> str:
+        """
+        Status of the solve result rejecting the sudoku
+        """
+        return INVALID_INPUT if self.reason in INVALID_REASONS else UNSOLVABLE
+
+    def __repr__(self):
+        return "Issue(reason={}, cells={})".format(self.reason, self.cells)
+
+
+def _issues(values: Sequence[Optional[int]], box_size: Optional[int]) -> Iterator[Issue]:
+    if box_size is None:
+        box_size = box_size_of(len(values))
+    if box_size is None or len(values) != box_size ** 4:
+        yield Issue(WRONG_SIZE)
+        return
+
+    topology = get_topology(box_size)
+    size = topology.size
+    row_of, col_of, box_of = topology.row_of, topology.col_of, topology.box_of
+    # Values given in each unit, numbered like the topology units, and the cell holding each of them
+    masks = [0] * (3 * size)
+    given_cells = {}
+    valid = True
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        if not isinstance(value, Integral) or not 0 < value <= size:
+            valid = False
+            yield Issue(VALUE_OUT_OF_RANGE, (index,))
+            continue
+
+        bit = 1 << (value - 1)
+        duplicates = set()
+        for unit in (row_of[index], size + col_of[index], 2 * size + box_of[index]):
+            if masks[unit] & bit:
+                valid = False
+                # Two cells of a row or a column can also share their box
+                cells = (given_cells[unit, value], index)
+                if cells not in duplicates:
+                    duplicates.add(cells)
+                    yield Issue(DUPLICATE_VALUE, cells)
+            else:
+                masks[unit] |= bit
+                given_cells[unit, value] = index
+
+    if not valid:
+        return
+
+    candidates = [0] * len(values)
+    for index, value in enumerate(values):
+        if value is None:
+            used = masks[row_of[index]] | masks[size + col_of[index]] | masks[2 * size + box_of[index]]
+            candidates[index] = topology.all_values & ~used
+            if not candidates[index]:
+                yield Issue(NO_CANDIDATES, (index,))
+        else:
+            candidates[index] = 1 << (value - 1)
+
+    for unit in topology.units:
+        placeable = 0
+        for index in unit:
+            placeable |= candidates[index]
+        if placeable != topology.all_values:
+            yield Issue(NO_PLACE_FOR_VALUE, unit)
+
+
+def check_sudoku(values: Sequence[Optional[int]], box_size: Optional[int] = None) -> Optional[Issue]:
+    """
+    Check the size and the values of a sudoku, the duplicate givens, the cells left without
+    candidates and the units where a value cannot be placed, in a single pass over the cells
+    :param box_size: Expected box size, by default any square sudoku size is accepted
+    :return: First issue found, None if the sudoku can be searched
+    """
+    return next(_issues(values, box_size), None)
+
+
+def find_issues(values: Sequence[Optional[int]], box_size: Optional[int] = None) -> List[Issue]:
+    """
+    All the issues of a sudoku, the contradictions only being looked for when the values are valid
+    """
+    return list(_issues(values, box_size))